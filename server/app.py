@@ -2,11 +2,23 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import random
 import os
+import time
+from patterns import decode_pattern, encode_pattern
 from solver import (
-    feedback_pattern, filter_candidates, pick_best_guess,
-    start_candidates, get_secret_words, is_valid_guess, VALID
+    candidates_after, choose_guess_ids, equivalent_guess_ids, feedback_pattern, guess_stats, ranked_guess_ids,
+    start_candidate_ids, get_secret_words, is_valid_guess, ENGINE, FEEDBACK_CACHE, SCORING_MODES, SCORING_ALIASES, TT,
+    DEFAULT_TOP_K, LOOKAHEAD_OBJECTIVES, PRIORS_VERSION, bucket_masks
 )
+from hardmode import legal_pool
+from scoring import DEFAULT_BLEND, PRUNING, check_objective
+from tree import get_tree, next_guess
+from words import GUESS_IDS, WORD_ID, WORDS
 DEFAULT_FIRST_GUESS = os.environ.get("DEFAULT_FIRST_GUESS", "raise")
+DEFAULT_BUDGET_MS = float(os.environ.get("WORDLE_SOLVE_BUDGET_MS", "1000"))
+# equivalent guesses listed with nextGuess
+ALTERNATIVES_SHOWN = 10
+# most entries "top" may ask for
+MAX_TOP = 50
 
 app = Flask(__name__)
 # Needed in local dev because web runs at :5173 and server at :5001 (different origins)
@@ -16,6 +28,14 @@ CORS(app)
 def health():
     return {"ok": True}
 
+@app.get("/stats")
+def stats():
+    return {"feedback": ENGINE.stats(), "feedbackCache": FEEDBACK_CACHE.stats(),
+            "transposition": TT.stats(), "pruning": PRUNING.stats(),
+            "bucketMasks": bucket_masks.cache_info()._asdict(),
+            # digest of the answer priors in use (null: every answer equally likely)
+            "answerPriors": PRIORS_VERSION}
+
 @app.get("/random_answer")
 def random_answer():
     words = get_secret_words()
@@ -34,7 +54,7 @@ def api_feedback():
     if len(guess) != 5 or len(answer) != 5 or not guess.isalpha() or not answer.isalpha():
         return jsonify({"error": "guess and answer must be 5 letters (a-z)"}), 400
 
-    return jsonify({"pattern": feedback_pattern(guess, answer)})
+    return jsonify({"pattern": decode_pattern(feedback_pattern(guess, answer))})
 
 @app.post("/solve")
 def api_solve():
@@ -42,72 +62,171 @@ def api_solve():
     Request JSON:
       {
         "history": [{"guess":"slate","pattern":"BBYBB"}, ...],
-        "mode": "easy" | "hard",
-        "sample": 800
+        "mode": "easy" | "hard",           # hard: NYT rules, revealed hints must be reused
+        "scoring": "exact" | "racing",    # default exact; racing samples adaptively
+        "objective": "expected" | "entropy" | "blend" | "minimax",   # default expected
+        "blend": 0.5,                      # weight on expected for "blend"
+        "depth": 1 | 2,                    # 2 = two-ply lookahead (expected/entropy)
+        "topK": 10,                        # first guesses searched at depth 2
+        "budgetMs": 1000,                  # time budget for the depth-2 search
+        "policy": "search" | "tree",       # tree: follow build_tree.py's tree
+        "deadline_ms": 150,                # optional: answer within about this time (top, search
+                                           # and alternatives share it)
+        "top": 5,                          # optional: also rank the 5 best guesses (one exact pass)
+        "alternatives": true               # optional: list guesses equivalent to nextGuess (one pass)
       }
     Response JSON:
       {
         "nextGuess": "cabin",
         "candidates": 42,
-        "expectedRemaining": 7.8
+        "expectedRemaining": 7.8,
+        "entropy": 4.1,                    # bits, whatever the objective
+        "worstCase": 12,                   # most candidates that can remain
+        "policy": "tree",                  # "search" when the history left the tree
+        "complete": true,                  # false if deadline_ms cut any of them short
+        "alternatives": ["cobia"],         # only if asked: guesses that split the candidates the same
+        "alternativeCount": 1,             # way (and win this turn just when nextGuess can; capped)
+        "top": [{"guess": "cabin", "score": 7.8, "worstCase": 12, "buckets": 19,
+                 "candidate": true, "equivalents": ["cobia"]}, ...]   # only if asked
       }
+    "top" scores under the requested objective, whatever picked nextGuess
+    (a tree, the endgame search or depth 2 can prefer another guess).
     """
     data = request.get_json(force=True)
     history = data.get("history", [])
     mode = (data.get("mode") or "easy").lower()
-    sample = int(data.get("sample", 800))
-    
+    scoring = (data.get("scoring") or "exact").lower()
+    scoring = SCORING_ALIASES.get(scoring, scoring)
+    if scoring not in SCORING_MODES:
+        return jsonify({"error": f"scoring must be one of {', '.join(SCORING_MODES)}"}), 400
+    objective = (data.get("objective") or "expected").lower()
+    try:
+        blend = float(data.get("blend", DEFAULT_BLEND))
+        check_objective(objective, blend)
+        depth = int(data.get("depth", 1))
+        top_k = int(data.get("topK", DEFAULT_TOP_K))
+        budget_ms = float(data.get("budgetMs", DEFAULT_BUDGET_MS))
+        if depth == 2 and objective not in LOOKAHEAD_OBJECTIVES:
+            raise ValueError(f"depth 2 needs objective {' or '.join(LOOKAHEAD_OBJECTIVES)}")
+        if depth not in (1, 2) or top_k < 1:
+            raise ValueError("depth must be 1 or 2 and topK at least 1")
+        deadline_ms = data.get("deadline_ms")
+        if deadline_ms is not None:
+            deadline_ms = float(deadline_ms)
+            if deadline_ms <= 0:
+                raise ValueError("deadline_ms must be positive")
+        top = int(data.get("top") or 0)
+        if not 0 <= top <= MAX_TOP:
+            raise ValueError(f"top must be between 0 and {MAX_TOP}")
+        alternatives = data.get("alternatives")
+        if alternatives is None:
+            alternatives = False
+        elif not isinstance(alternatives, bool):
+            raise ValueError("alternatives must be true or false")
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    deadline = None if deadline_ms is None else time.perf_counter() + deadline_ms / 1000.0
+    policy = (data.get("policy") or "search").lower()
+    if policy not in ("search", "tree"):
+        return jsonify({"error": "policy must be search or tree"}), 400
+    tree = get_tree() if policy == "tree" else None
+    if policy == "tree" and tree is None:
+        return jsonify({"error": "No decision tree for these word lists (run build_tree.py)"}), 400
+    if policy == "tree" and mode == "hard":
+        return jsonify({"error": "The decision tree is for easy mode"}), 400
+
     if not history:
-        cands = start_candidates()
-        guess = DEFAULT_FIRST_GUESS
+        cands = start_candidate_ids()
+        guess = tree["opener"] if tree else DEFAULT_FIRST_GUESS
         # (Optional) sanity check it's allowed; fall back if not
         if not is_valid_guess(guess):
             guess = "slate"
 
-        # Keep your UI happy with a quick, lightweight estimate:
-        from collections import Counter
-        import random
-        c_list = list(cands)
-        n = len(c_list)
-        eval_list = c_list if n <= 600 else random.sample(c_list, 600)
-        buckets = Counter(feedback_pattern(guess, w) for w in eval_list)
-        m = len(eval_list)
-        expected = sum((cnt / m) * (cnt * (n / m)) for cnt in buckets.values()) if m else 0.0
+        # Keep your UI happy: one matrix row gives both numbers exactly
+        st = guess_stats(WORD_ID[guess], cands)
+        ranked, complete = _ranked(cands, GUESS_IDS, objective, blend, top, deadline)
+        # nothing revealed yet, so hard mode allows every guess too
+        alts, done = _alternatives(WORD_ID[guess], cands, GUESS_IDS, alternatives, deadline)
 
         return jsonify({
             "nextGuess": guess,
             "candidates": len(cands),
-            "expectedRemaining": expected
+            "expectedRemaining": st["expected"],
+            "entropy": st["entropy"],
+            "worstCase": st["worst"],
+            "policy": policy,
+            "complete": complete and done,
+            **alts,
+            **_top_json(ranked)
         })
 
-    # rebuild candidates from scratch based on history
-    cands = start_candidates()
+    # rebuild candidates from scratch based on history (one bitset AND per turn)
     try:
-        for h in history:
-            g = (h["guess"]).lower().strip()
-            p = h["pattern"]
-            cands = filter_candidates(cands, g, p)
+        played = [((h["guess"]).lower().strip(), encode_pattern(h["pattern"])) for h in history]
+        turns = [(WORD_ID.get(g, g), p) for g, p in played]
+        cands = candidates_after(turns)
     except Exception:
         return jsonify({"error": "Malformed history items"}), 400
 
     if not cands:
         return jsonify({"error": "No candidates remain (history inconsistent?)"}), 400
-
-    easy_mode = (mode == "easy")
-    guess = pick_best_guess(cands, VALID, easy_mode=easy_mode, sample_limit=sample)
-
-    # Optional: compute expected remaining for UI
-    from collections import Counter
-    c_list = list(cands)
-    n = len(c_list)
-    buckets = Counter(feedback_pattern(guess, w) for w in c_list)
-    expected = sum((cnt / n) * cnt for cnt in buckets.values()) if n else 0.0
+    cands = cands.ids()
+
+    # hard mode searches every guess that reuses the revealed hints (see hardmode.py)
+    pool = legal_pool(turns) if mode == "hard" else GUESS_IDS
+    # ranked first: it leaves the exact one-ply winner in the TT for the search below
+    ranked, ranked_complete = _ranked(cands, pool, objective, blend, top, deadline)
+    followed = next_guess(tree, played) if tree else None
+    complete = True
+    if followed is not None:
+        guess = WORD_ID[followed]
+    else:
+        # off the tree (or not asked to follow one): search
+        policy = "search"
+        guess, _, complete = choose_guess_ids(cands, pool, easy_mode=True,
+                                              scoring=scoring, objective=objective, blend=blend,
+                                              depth=depth, top_k=top_k, budget_ms=budget_ms,
+                                              deadline_ms=_time_left(deadline))
+
+    # Optional: exact stats for UI, whichever objective picked the guess
+    st = guess_stats(guess, cands)
+    alts, done = _alternatives(guess, cands, pool, alternatives, deadline)
 
     return jsonify({
-        "nextGuess": guess,
+        "nextGuess": WORDS[guess],
         "candidates": len(cands),
-        "expectedRemaining": expected
+        "expectedRemaining": st["expected"],
+        "entropy": st["entropy"],
+        "worstCase": st["worst"],
+        "policy": policy,
+        "complete": complete and ranked_complete and done,
+        **alts,
+        **_top_json(ranked)
     })
 
+def _time_left(deadline):
+    """Milliseconds until 'deadline' (a time.perf_counter() value), or None without one."""
+    return None if deadline is None else max((deadline - time.perf_counter()) * 1000.0, 0.0)
+
+def _ranked(cands, pool, objective, blend, top, deadline):
+    if not top:
+        return None, True
+    return ranked_guess_ids(cands, pool, True, objective, blend, top, deadline_ms=_time_left(deadline))
+
+def _alternatives(guess, cands, pool, wanted, deadline):
+    # a full pass over the pool, so only when asked for
+    if not wanted:
+        return {}, True
+    same, done = equivalent_guess_ids(guess, cands, pool, deadline_ms=_time_left(deadline))
+    return {"alternatives": [WORDS[i] for i in same[:ALTERNATIVES_SHOWN]], "alternativeCount": len(same)}, done
+
+def _top_json(ranked):
+    if ranked is None:
+        return {}
+    return {"top": [{"guess": WORDS[r["id"]], "score": r["score"], "worstCase": r["worst"],
+                     "buckets": r["buckets"], "candidate": r["candidate"],
+                     "equivalents": [WORDS[i] for i in r["equivalents"][:ALTERNATIVES_SHOWN]]}
+                    for r in ranked]}
+
 if __name__ == "__main__":
     app.run(port=5001, debug=True)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Build the guess x answer pattern matrix that solver.py memory-maps at startup.
+
+    python build_patterns.py                 # all cores, default path
+    python build_patterns.py --workers 4 --out /tmp/pattern_matrix.bin
+    python build_patterns.py --check         # exit 1 if missing or stale
+
+Run it on a deploy box after editing the word lists so workers start with
+the matrix already on disk.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+
+from patterns import MATRIX_PATH, build_matrix_file, check_matrix
+from words import N_ANSWERS, WORDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Wordle pattern matrix.")
+    parser.add_argument("--out", default=MATRIX_PATH, help="Output path (default: %(default)s).")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: all cores).")
+    parser.add_argument("--check", action="store_true",
+                        help="Only report whether the file matches the current word lists.")
+    args = parser.parse_args()
+
+    reason = check_matrix(args.out, WORDS, WORDS[:N_ANSWERS])
+    if args.check:
+        print(f"{args.out}: {reason or 'up to date'}")
+        sys.exit(1 if reason else 0)
+
+    t0 = time.perf_counter()
+    build_matrix_file(args.out, WORDS, WORDS[:N_ANSWERS], workers=args.workers)
+    print(f"Wrote {len(WORDS)}x{N_ANSWERS} matrix to {args.out} "
+          f"in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Build the decision tree that /solve follows with "policy": "tree".
+
+    python build_tree.py                          # opener raise, all cores, optimal
+    python build_tree.py --opener salet --breadth 20 --workers 8   # quicker, not proven optimal
+    python build_tree.py --checkpoint tree.ckpt   # resumable: rerun to continue
+
+The checkpoint holds every subproblem solved so far (see tree.py); killing
+the build and rerunning with the same --checkpoint picks up where it left
+off. The tree is written to --out only once it is complete.
+"""
+from __future__ import annotations
+import argparse
+import os
+import time
+
+from tree import DEFAULT_BREADTH, TREE_PATH, build_tree, save_tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a Wordle decision tree.")
+    parser.add_argument("--opener", default=os.environ.get("DEFAULT_FIRST_GUESS", "raise"),
+                        help="First guess at the root (default: %(default)s).")
+    parser.add_argument("--breadth", type=int, default=DEFAULT_BREADTH,
+                        help="Splits tried per node, best first (default 0 = every distinct "
+                             "split, the only setting whose tree is optimal).")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: all cores).")
+    parser.add_argument("--checkpoint", default=f"{TREE_PATH}.ckpt",
+                        help="Memo checkpoint for resuming (default: %(default)s).")
+    parser.add_argument("--out", default=TREE_PATH, help="Output path (default: %(default)s).")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+
+    def progress(done, total):
+        print(f"… {done}/{total} subtrees ({time.perf_counter() - t0:.0f}s)")
+
+    tree = build_tree(args.opener, breadth=args.breadth, workers=args.workers,
+                      checkpoint=args.checkpoint or None, progress=progress)
+    save_tree(tree, args.out)
+    scope = "optimal" if tree["exact"] else f"best within breadth {tree['breadth']}, not proven optimal"
+    print(f"Wrote tree for {args.opener} to {args.out}: {tree['totalGuesses']} guesses, "
+          f"average {tree['average']:.4f} ({scope}), in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Candidate sets as bitsets over answer ids.
+
+Bit i of the mask is set when answer id i (see words.py) is still possible.
+The mask is a plain Python int, so intersection is one '&', size is a
+popcount, and the set is hashable for use as a cache key.
+"""
+from __future__ import annotations
+import hashlib
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from words import ID_DTYPE, N_ANSWERS
+
+_N_BYTES = (N_ANSWERS + 7) // 8
+
+
+def mask_from_bools(flags: np.ndarray) -> int:
+    """Length-N_ANSWERS bool array -> bit mask."""
+    return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+
+
+class CandidateSet:
+    """Immutable set of answer ids backed by an N_ANSWERS-bit mask."""
+    __slots__ = ('bits',)
+
+    def __init__(self, bits: int = 0):
+        self.bits = bits
+
+    @classmethod
+    def full(cls) -> CandidateSet:
+        return cls((1 << N_ANSWERS) - 1)
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> CandidateSet:
+        flags = np.zeros(N_ANSWERS, dtype=bool)
+        flags[np.fromiter(ids, dtype=np.intp)] = True
+        return cls(mask_from_bools(flags))
+
+    def ids(self) -> np.ndarray:
+        """Member ids as a sorted uint16 array."""
+        raw = np.frombuffer(self.bits.to_bytes(_N_BYTES, 'little'), dtype=np.uint8)
+        flags = np.unpackbits(raw, bitorder='little', count=N_ANSWERS)
+        return np.flatnonzero(flags).astype(ID_DTYPE)
+
+    def fingerprint(self) -> bytes:
+        """16-byte digest of the mask; unlike hash(), stable across processes and runs."""
+        return hashlib.blake2b(self.bits.to_bytes(_N_BYTES, 'little'), digest_size=16).digest()
+
+    def __and__(self, other: CandidateSet) -> CandidateSet:
+        return CandidateSet(self.bits & other.bits)
+
+    def __or__(self, other: CandidateSet) -> CandidateSet:
+        return CandidateSet(self.bits | other.bits)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __contains__(self, i: int) -> bool:
+        return 0 <= i < N_ANSWERS and (self.bits >> i) & 1 == 1
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids().tolist())
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CandidateSet) and self.bits == other.bits
+
+    def __hash__(self) -> int:
+        return hash(self.bits)
+
+    def __repr__(self) -> str:
+        return f"CandidateSet(<{len(self)} answers>)"
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Brute-force regression checks for the solver's exactness claims.
+
+    python check_solver.py            # every check
+    python check_solver.py priors     # just the named ones
+
+Each check compares a fast path against a slow, obviously correct one on a
+small deterministic sample (fixed seeds, fixed histories), prints one line
+and fails the run on any mismatch, the way `python feedback.py check` does
+for the feedback backends.
+"""
+from __future__ import annotations
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from endgame import Endgame
+from hardmode import legal_pool
+from patterns import ALL_GREEN, PATTERN_COUNT, decode_pattern
+from priors import MIN_WEIGHT, load_priors
+from scoring import (
+    DEFAULT_BLEND, PRUNE_MIN_CANDIDATES, PRUNE_OBJECTIVES, _pruned_histograms, best_guess, candidate_mass,
+    equivalence_classes, equivalent_guesses, pool_scores, top_guesses,
+)
+from solver import ENGINE, filter_ids, informative_pool
+from words import ANSWER_IDS, GUESS_IDS, WORD_ID, WORDS, id_flags
+
+
+def _bucket(history) -> np.ndarray:
+    """Candidates left after [(guess word, answer word), ...]."""
+    cands = ANSWER_IDS
+    for guess, answer in history:
+        g = WORD_ID[guess]
+        cands = filter_ids(cands, g, int(ENGINE.row(g)[WORD_ID[answer]]))
+    return cands
+
+
+def check_priors() -> bool:
+    """Zero weights in a priors file never leave candidates without mass."""
+    small, large = _bucket([("raise", "shake")]), _bucket([("raise", "could")])
+    zero = set(ANSWER_IDS[::3].tolist()) | set(small.tolist()) | set(large.tolist())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "priors.txt")
+        with open(path, "w") as fh:
+            fh.writelines(f"{WORDS[i]} {0 if i in zero else 1}\n" for i in ANSWER_IDS.tolist())
+        prior = load_priors(path)
+
+    ok = bool((prior[ANSWER_IDS] > 0).all())
+    eg = Endgame(ENGINE, GUESS_IDS, weights=prior[:len(ANSWER_IDS)])
+    for cands in (small, large):
+        is_cand = id_flags(cands)
+        if len(cands) <= 20:
+            _, turns, _ = eg.best(cands)
+            ok &= bool(np.isfinite(turns))
+        for objective in ("expected", "entropy", "minimax"):
+            _, score, _ = best_guess(ENGINE, GUESS_IDS, cands, is_cand, objective, prior=prior)
+            scores = top_guesses(ENGINE, GUESS_IDS, cands, is_cand, 5, objective, prior=prior)[1]
+            ok &= bool(np.isfinite(score) and np.isfinite(scores).all())
+    print(f"priors: zero-weight candidate sets of {len(small)} and {len(large)} "
+          f"score finitely | {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def _partition(g: int, cand_ids: np.ndarray):
+    """Guess g's buckets over the candidates as a set of sets, and whether g is one of them."""
+    buckets: dict = {}
+    for c, p in zip(cand_ids.tolist(), ENGINE.row(g)[cand_ids].tolist()):
+        buckets.setdefault(p, set()).add(c)
+    return frozenset(frozenset(b) for b in buckets.values()), g in set(cand_ids.tolist())
+
+
+def check_equivalents() -> bool:
+    """equivalent_guesses and equivalence_classes group exactly the equal (partition, candidate) pairs."""
+    rng = np.random.default_rng(22)
+    ok, positions = True, 0
+    for history in ([("raise", "shake")], [("raise", "could"), ("could", "nymph")],
+                    [("raise", "tease")], [("slate", "crane")]):
+        cands = _bucket(history)
+        pool = np.union1d(rng.choice(GUESS_IDS, 1500, replace=False), cands).astype(GUESS_IDS.dtype)
+        sig = [_partition(g, cands) for g in pool.tolist()]
+        for g in (int(cands[0]), int(pool[0])):
+            want = {h for h, s in zip(pool.tolist(), sig) if s == _partition(g, cands)}
+            ok &= set(equivalent_guesses(ENGINE, g, pool, cands)[0].tolist()) == want
+        _, rep_of = equivalence_classes(ENGINE, pool, cands, id_flags(cands))
+        ok &= all((rep_of[i] == rep_of[j]) == (sig[i] == sig[j])
+                  for i in range(0, len(pool), 7) for j in range(i, len(pool), 11))
+        positions += 1
+    print(f"equivalents: {positions} positions against explicit partitions | {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def _splits(block: np.ndarray) -> np.ndarray:
+    """Number of buckets in each row of a pattern block."""
+    rows = np.sort(block, axis=1)
+    return 1 + np.count_nonzero(rows[:, 1:] != rows[:, :-1], axis=1)
+
+
+def check_dominance() -> bool:
+    """Every guess informative_pool drops splits no finer than some guess it keeps."""
+    rng = np.random.default_rng(21)
+    ok, dropped_checked = True, 0
+    for history in ([("raise", "could")], [("raise", "tease")], [("clout", "baker")], [("slate", "nymph")]):
+        cands = _bucket(history)
+        kept = informative_pool(GUESS_IDS, cands)
+        ok &= bool(id_flags(kept)[cands].all())
+        dropped = np.setdiff1d(GUESS_IDS, kept)
+        block = ENGINE.block(kept, cands).astype(np.int64)
+        buckets = _splits(block)
+        for h in rng.choice(dropped, min(30, len(dropped)), replace=False).tolist():
+            # k refines h when pairing k's pattern with h's adds no buckets to k's
+            paired = block * PATTERN_COUNT + ENGINE.row(h)[cands]
+            ok &= bool((_splits(paired) == buckets).any())
+            dropped_checked += 1
+    print(f"dominance: {dropped_checked} dropped guesses each refined by a kept one | {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def _hard_mode_allows(word: str, history) -> bool:
+    """NYT hard mode straight from the rules, for [(guess word, 'BYGBB'), ...]."""
+    for guess, marks in history:
+        if any(m == "G" and word[i] != g for i, (g, m) in enumerate(zip(guess, marks))):
+            return False
+        shown: dict = {}
+        for g, m in zip(guess, marks):
+            if m != "B":
+                shown[g] = shown.get(g, 0) + 1
+        if any(word.count(g) < k for g, k in shown.items()):
+            return False
+    return True
+
+
+def check_legal_pool() -> bool:
+    """legal_pool's bitset ANDs allow exactly the guesses the hard-mode rules do."""
+    rng = np.random.default_rng(24)
+    histories = [[("speed", "abide")], [("llama", "hello"), ("eerie", "hello")], [("geese", "crepe")]]
+    for _ in range(17):
+        answer = int(rng.choice(ANSWER_IDS))
+        histories.append([(WORDS[g], WORDS[answer]) for g in rng.choice(GUESS_IDS, rng.integers(1, 4))])
+    ok = True
+    for history in histories:
+        played = [(guess, int(ENGINE.row(WORD_ID[guess])[WORD_ID[answer]])) for guess, answer in history]
+        marks = [(guess, decode_pattern(p)) for guess, p in played]
+        want = [i for i, w in enumerate(WORDS) if _hard_mode_allows(w, marks)]
+        ok &= legal_pool(played).tolist() == want
+    print(f"legal_pool: {len(histories)} histories against the hard-mode rules | {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def _brute_cost(ids: tuple, pool, weights, memo: dict) -> float:
+    """
+    Fewest total guesses for the answers 'ids', trying every reply and every
+    guess from 'ids' and 'pool' (just 'ids' when the pool is None).
+    """
+    if ids not in memo:
+        mass = float(weights[list(ids)].sum())
+        best = np.inf
+        for g in (ids if pool is None else sorted(set(ids) | pool)):
+            buckets: dict = {}
+            for a in ids:
+                buckets.setdefault(int(ENGINE.row(g)[a]), []).append(a)
+            if len(buckets) == 1 and ALL_GREEN not in buckets:
+                continue  # learns nothing
+            best = min(best, mass + sum(_brute_cost(tuple(b), pool, weights, memo)
+                                        for p, b in buckets.items() if p != ALL_GREEN))
+        memo[ids] = best
+    return memo[ids]
+
+
+def check_endgame() -> bool:
+    """Endgame's branch-and-bound costs equal an exhaustive search, with and without priors."""
+    rng = np.random.default_rng(20)
+    pool = rng.choice(GUESS_IDS, 60, replace=False)
+    sets = []
+    for answer in rng.choice(ANSWER_IDS, 400, replace=False).tolist():
+        cands = _bucket([("raise", WORDS[answer]), ("clout", WORDS[answer])])
+        if 3 <= len(cands) <= 8 and not any(np.array_equal(cands, s) for s in sets):
+            sets.append(cands)
+    uniform = np.ones(len(ANSWER_IDS))
+    skewed = rng.gamma(0.5, 1.0, len(ANSWER_IDS)) + 1e-3
+    ok = True
+    for weights, prior in ((uniform, None), (skewed, skewed)):
+        for easy_mode in (True, False):
+            eg = Endgame(ENGINE, pool, easy_mode=easy_mode, weights=prior)
+            brute_pool, memo = (set(pool.tolist()) if easy_mode else None), {}
+            for cands in sets:
+                ids = tuple(cands.tolist())
+                want = _brute_cost(ids, brute_pool, weights, memo)
+                g, turns, _ = eg.best(cands)
+                mass = float(weights[cands].sum())
+                ok &= bool(np.isclose(turns * mass, want))
+                # and the guess it names achieves that cost
+                row = ENGINE.row(g)[cands]
+                got = mass + sum(_brute_cost(tuple(cands[row == p].tolist()), brute_pool, weights, memo)
+                                 for p in np.unique(row).tolist() if p != ALL_GREEN)
+                ok &= bool(np.isclose(got, want))
+    print(f"endgame: {len(sets)} sets, easy and hard, uniform and weighted, "
+          f"against exhaustive search | {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def check_pruning() -> bool:
+    """
+    Pruning's prefix bounds never drop a guess that scores at or under the
+    incumbent, and best_guess's pruned pass picks what the full pass does,
+    with and without skewed priors.
+    """
+    rng = np.random.default_rng(25)
+    priors = [None]
+    for shape in (0.3, 2.0):
+        prior = np.zeros(len(WORDS))
+        prior[ANSWER_IDS] = rng.gamma(shape, 1.0, len(ANSWER_IDS))
+        prior[ANSWER_IDS[::3]] = MIN_WEIGHT
+        priors.append(prior * (len(ANSWER_IDS) / prior.sum()))
+    pool = rng.permutation(GUESS_IDS)
+    ok, runs, pruned = True, 0, 0
+    # small sets too: their best guesses leave mostly singletons, where the bounds are tight
+    small = [_bucket([("raise", answer)]) for answer in ("could", "tease", "nymph")]
+    for cands in [ANSWER_IDS, np.sort(rng.choice(ANSWER_IDS, PRUNE_MIN_CANDIDATES + 200, replace=False))] + small:
+        is_cand = id_flags(cands)
+        for prior in priors:
+            weights = candidate_mass(cands, prior)[0]
+            for objective in PRUNE_OBJECTIVES:
+                scores = pool_scores(ENGINE, pool, cands, objective, prior=prior)
+                for cut in np.quantile(scores, [0.0, 0.001, 0.01]).tolist():
+                    kept = np.concatenate([ids for _, ids, _ in _pruned_histograms(
+                        ENGINE, pool, cands, objective, DEFAULT_BLEND, lambda: (cut,), weights)])
+                    # a hair of slack for float sums accumulated block by block
+                    ok &= bool(np.isin(pool[scores < cut - 1e-9], kept).all())
+                    pruned += len(pool) - len(kept)
+                fast = best_guess(ENGINE, pool, cands, is_cand, objective, prior=prior)
+                slow = best_guess(ENGINE, pool, cands, is_cand, objective, prune=False, prior=prior)
+                ok &= fast[0] == slow[0] and bool(np.isclose(fast[1], slow[1]))
+                runs += 1
+    ok &= pruned > 0
+    print(f"pruning: {runs} set/prior/objective runs, {pruned} guesses pruned, checked against full scores "
+          f"| {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+CHECKS = {
+    "priors": check_priors,
+    "equivalents": check_equivalents,
+    "dominance": check_dominance,
+    "legal_pool": check_legal_pool,
+    "endgame": check_endgame,
+    "pruning": check_pruning,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Brute-force regression checks for the solver.")
+    parser.add_argument("checks", nargs="*", metavar="check",
+                        help=f"Checks to run (default: all of {', '.join(CHECKS)}).")
+    args = parser.parse_args()
+    unknown = [c for c in args.checks if c not in CHECKS]
+    if unknown:
+        parser.error(f"unknown check {unknown[0]!r} (choose from {', '.join(CHECKS)})")
+    ok = True
+    for name in args.checks or CHECKS:
+        ok &= CHECKS[name]()
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
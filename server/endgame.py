@@ -0,0 +1,132 @@
+"""
+Endgame: exact play once only a handful of candidates are left.
+
+With n <= ENDGAME_SIZE candidates (WORDLE_ENDGAME_SIZE, 0 turns it off) the
+one-move objectives stop being a good proxy: a non-candidate with the best
+split can cost a turn that simply guessing a candidate would have saved.
+Endgame searches every guess and every reply for the fewest total guesses
+to solve the set,
+
+  cost(S) = |S| + Σ cost(S_p) over the non-solved buckets p of the guess
+
+(search.py's recurrence, shared with tree.py), so cost(S) / |S| is the expected number
+of turns left. With answer priors (priors.py) |S| is the mass of S
+instead, so answers pay in proportion to how likely they are; no set can
+cost less than its floor 2|S| - (heaviest weight in S), which is
+2|S| - 1 without priors.
+
+Guesses with the same pattern row over S split it the same way, so each
+node scores one representative per row (a candidate if there is one, else
+the lowest id). Every guess gets the vectorized bound |S| + Σ floor(S_p)
+before any subtree is searched; guesses are tried in bound order and the
+loop ends at the first bound that cannot beat the best found. A guess
+that puts every candidate in its own bucket costs exactly its bound, so
+when one leads the order it is optimal and the search stops there.
+Results are memoized on candidate bitsets (see candidates.py), exact costs
+and the lower bounds proven by cut-off searches alike. best() takes a
+deadline: when it passes, the best guess found so far comes back marked
+incomplete.
+"""
+from __future__ import annotations
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from candidates import CandidateSet
+from patterns import ALL_GREEN
+from search import BranchAndBound, OutOfTime, bound_order, lower_bound, split_bounds
+
+ENDGAME_SIZE = int(os.environ.get("WORDLE_ENDGAME_SIZE", "20"))
+# with a deadline, the least time left (ms) worth starting a search in; scoring
+# the first node alone takes ~5-25 ms, so below this one-ply scoring answers instead
+ENDGAME_MIN_MS = float(os.environ.get("WORDLE_ENDGAME_MIN_MS", "25"))
+# objectives that are all stand-ins for "fewest guesses"; minimax asks for
+# something else, so it keeps its own scoring down to the last guess
+ENDGAME_OBJECTIVES = ("expected", "entropy", "blend")
+# memo entries per Endgame before it starts over
+DEFAULT_MEMO_ENTRIES = 1 << 18
+
+
+class Endgame(BranchAndBound):
+    """
+    Exact expected-turns search over small candidate sets for one guess
+    pool. easy_mode=False plays from the candidates only (as hard mode
+    does elsewhere in the solver). 'weights' are answer priors indexed by
+    answer id (None: every answer counts 1).
+    """
+
+    def __init__(self, engine, pool_ids: np.ndarray, easy_mode: bool = True,
+                 max_entries: int = DEFAULT_MEMO_ENTRIES, weights: Optional[np.ndarray] = None):
+        super().__init__()
+        self.engine = engine
+        self.pool = np.asarray(pool_ids)
+        self.easy_mode = easy_mode
+        self.max_entries = max_entries
+        self.weights = weights
+        self.integral = weights is None
+
+    def best(self, cand_ids: np.ndarray,
+             deadline: Optional[float] = None) -> Tuple[int, float, bool]:
+        """
+        (guess id, expected turns to solve including it, whether the search
+        finished) for 'cand_ids'. If the time.perf_counter() value
+        'deadline' passes first, the guess is the best one found so far
+        (the best-bounded one if none had finished) and the turns are its
+        cost so far or its bound.
+        """
+        ids = np.sort(np.asarray(cand_ids))
+        mass = self.mass(ids)
+        if len(ids) <= 2:
+            # the heavier first (the lower id without priors)
+            g = ids[0] if self.weights is None else ids[np.argmax(self.weights[ids])]
+            return int(g), self.floor(ids) / mass, True
+        if len(self.memo) + len(self.bounds) > self.max_entries:
+            self.memo.clear()
+            self.bounds.clear()
+        try:
+            cost, g = self.search(CandidateSet.from_ids(ids).bits, floor=self.floor(ids),
+                                  deadline=deadline)
+        except OutOfTime as stop:
+            return stop.guess, stop.cost / mass, False
+        return g, cost / mass, True
+
+    # ---- costs -----------------------------------------------------------
+
+    def mass(self, ids) -> float:
+        """What guessing once costs the set 'ids': its size, or its weight with priors."""
+        return len(ids) if self.weights is None else float(self.weights[ids].sum())
+
+    def floor(self, ids) -> float:
+        """Fewest total guesses any strategy can spend on 'ids' (weighted with priors)."""
+        if self.weights is None:
+            return lower_bound(len(ids))
+        w = self.weights[ids]
+        return 2.0 * float(w.sum()) - float(w.max()) if len(w) else 0.0
+
+    # ---- moves -----------------------------------------------------------
+
+    def moves(self, ids: np.ndarray):
+        """
+        One guess per distinct split of 'ids' with its bound and pattern
+        row, best bound first (ties: smaller buckets, then candidates, then
+        id). A guess that splits perfectly (every bucket a single candidate)
+        costs exactly its bound, so one that leads the order is optimal.
+        """
+        if self.easy_mode:
+            others = np.setdiff1d(self.pool, ids, assume_unique=True)
+            guesses = np.concatenate([ids, others]).astype(ids.dtype)
+        else:
+            guesses = ids
+        guesses, block, lb, ss, is_cand, perfect = split_bounds(self.engine, guesses, ids, self.weights)
+        order = bound_order(guesses, lb, ss, is_cand)
+        moves = list(zip(guesses[order].tolist(), lb[order].tolist(), block[order]))
+        return moves, bool(perfect[order[0]])
+
+    def children(self, ids: np.ndarray, g: int, row: np.ndarray):
+        kids: Dict[int, list] = {}
+        for i, c in zip(ids.tolist(), row.tolist()):
+            if c != ALL_GREEN:
+                kids.setdefault(c, []).append(i)
+        return [(CandidateSet.from_ids(k).bits, self.floor(k))
+                for k in sorted(kids.values(), key=len, reverse=True)]
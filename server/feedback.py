@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Feedback engine: one interface over interchangeable backends.
+
+  python  pure-Python two-pass counting, one (guess, answer) pair at a time
+  numpy   the vectorized kernels in patterns.py, many guesses against many words
+  matrix  lookups in the precomputed, memory-mapped guess x answer matrix
+
+Pick one with WORDLE_FEEDBACK_BACKEND (default: matrix). The python and
+numpy backends keep rows looked up one at a time (row()) in a RowCache
+bounded by WORDLE_ROW_CACHE_BYTES. Blocks (block(), the scoring passes
+over a whole pool) are computed straight over the candidate columns with
+patterns.feedback_block and never enter the cache: a pass touches every
+guess once and would only evict the rows worth keeping. Single-pair lookups
+can go through a FeedbackCache bounded by WORDLE_FEEDBACK_CACHE_BYTES. Every backend returns the same base-3 pattern
+codes; `python feedback.py check` verifies that over the full
+guess x answer space and reports throughput per backend.
+"""
+from __future__ import annotations
+from functools import lru_cache
+import argparse
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from patterns import (
+    MATRIX_PATH, encode_words, feedback_block, feedback_codes, letter_counts, load_matrix, pattern_code,
+)
+from rows import RowCache
+from words import LETTERS, N_ANSWERS, WORD_ID, WORDS
+
+BACKENDS = ("python", "numpy", "matrix")
+# ~1800 rows of 2313 bytes (the full matrix is ~30 MB): the candidates and strong splitters
+DEFAULT_ROW_CACHE_BYTES = 4 * 1024 * 1024
+DEFAULT_FEEDBACK_CACHE_BYTES = 16 * 1024 * 1024
+
+_ANSWER_LETTERS = LETTERS[:N_ANSWERS]
+_ANSWER_COUNTS = letter_counts(_ANSWER_LETTERS)
+_ANSWER_COLUMNS = np.arange(N_ANSWERS)
+# guesses per feedback_block call, to keep its (guesses, candidates) temporaries small
+BLOCK_GUESSES = 256
+
+
+def python_pattern(guess: str, answer: str) -> int:
+    """Two-pass counting: mark greens and tally the rest of 'answer', then yellows."""
+    res = [0] * 5
+
+    # count non-green letters in answer
+    counts = [0] * 26
+    ai = lambda ch: ord(ch) - 97
+
+    # mark greens & tally remaining answer letters
+    for i, ch in enumerate(guess):
+        if ch == answer[i]:
+            res[i] = 2
+        else:
+            counts[ai(answer[i])] += 1
+
+    # mark yellows using counts
+    for i, ch in enumerate(guess):
+        if res[i] == 2:
+            continue
+        idx = ai(ch)
+        if counts[idx] > 0:
+            res[i] = 1
+            counts[idx] -= 1
+
+    return pattern_code(res)
+
+
+def _letters_to_words(letters: np.ndarray) -> List[str]:
+    return [bytes(r).decode('ascii') for r in (letters + ord('a')).astype(np.uint8)]
+
+
+def _ids(guess: str, answer: str):
+    gi = WORD_ID.get(guess)
+    ai = WORD_ID.get(answer)
+    if gi is None or ai is None or ai >= N_ANSWERS:
+        return None
+    return gi, ai
+
+
+class _CachedRowsBackend:
+    """Shared plumbing for backends that compute rows: pattern() and row() go through a RowCache."""
+    name = ""
+
+    def __init__(self, cache_bytes: int = DEFAULT_ROW_CACHE_BYTES):
+        self._rows = RowCache(self._compute_row, N_ANSWERS, cache_bytes)
+
+    def pattern(self, guess: str, answer: str) -> int:
+        ids = _ids(guess, answer)
+        if ids is None:
+            return self._pair(guess, answer)
+        return int(self.row(ids[0])[ids[1]])
+
+    def row(self, guess_id: int) -> np.ndarray:
+        return self._rows.row(guess_id)
+
+    def rows(self, guess_ids) -> np.ndarray:
+        return self.block(guess_ids, _ANSWER_COLUMNS)
+
+    def block(self, guess_ids, cand_ids) -> np.ndarray:
+        """(len(guess_ids), len(cand_ids)) patterns, computed over just those columns (not cached)."""
+        g = np.asarray(guess_ids)
+        cols = np.asarray(cand_ids)
+        letters, counts = _ANSWER_LETTERS[cols], _ANSWER_COUNTS[:, cols]
+        out = np.empty((len(g), len(cols)), dtype=np.uint8)
+        for lo in range(0, len(g), BLOCK_GUESSES):
+            out[lo:lo + BLOCK_GUESSES] = feedback_block(LETTERS[g[lo:lo + BLOCK_GUESSES]], letters, counts)
+        return out
+
+    def stats(self) -> Dict:
+        return {"backend": self.name, "rows": self._rows.stats()}
+
+
+class PythonBackend(_CachedRowsBackend):
+    name = "python"
+
+    def _pair(self, guess: str, answer: str) -> int:
+        return python_pattern(guess, answer)
+
+    def codes(self, guess: str, letters: np.ndarray) -> np.ndarray:
+        words = _letters_to_words(letters)
+        return np.fromiter((python_pattern(guess, w) for w in words), dtype=np.uint8, count=len(words))
+
+    def _compute_row(self, guess_id: int) -> np.ndarray:
+        g = WORDS[guess_id]
+        return np.fromiter((python_pattern(g, a) for a in WORDS[:N_ANSWERS]),
+                           dtype=np.uint8, count=N_ANSWERS)
+
+
+class NumpyBackend(_CachedRowsBackend):
+    name = "numpy"
+
+    def _pair(self, guess: str, answer: str) -> int:
+        return int(feedback_codes(guess, encode_words([answer]))[0])
+
+    def codes(self, guess: str, letters: np.ndarray) -> np.ndarray:
+        return feedback_codes(guess, letters)
+
+    def _compute_row(self, guess_id: int) -> np.ndarray:
+        return feedback_block(LETTERS[guess_id:guess_id + 1], _ANSWER_LETTERS, _ANSWER_COUNTS)[0]
+
+
+class MatrixBackend:
+    """Rows are slices of the mmap'd matrix; words outside it use the kernel."""
+    name = "matrix"
+
+    def __init__(self, path: str = MATRIX_PATH, rebuild: bool = True):
+        self.matrix = load_matrix(path, WORDS, WORDS[:N_ANSWERS], rebuild=rebuild)
+
+    def pattern(self, guess: str, answer: str) -> int:
+        ids = _ids(guess, answer)
+        if ids is None:
+            return python_pattern(guess, answer)
+        return int(self.matrix[ids])
+
+    def codes(self, guess: str, letters: np.ndarray) -> np.ndarray:
+        return feedback_codes(guess, letters)
+
+    def row(self, guess_id: int) -> np.ndarray:
+        return self.matrix[guess_id]
+
+    def rows(self, guess_ids) -> np.ndarray:
+        return self.matrix[guess_ids]
+
+    def block(self, guess_ids, cand_ids) -> np.ndarray:
+        """(len(guess_ids), len(cand_ids)) patterns, gathered without copying whole rows."""
+        g = np.asarray(guess_ids)
+        if len(g) and int(g[-1]) - int(g[0]) + 1 == len(g) and np.all(np.diff(g) == 1):
+            return np.take(self.matrix[int(g[0]):int(g[-1]) + 1], cand_ids, axis=1)
+        return self.matrix[np.ix_(g, cand_ids)]
+
+    def stats(self) -> Dict:
+        return {"backend": self.name, "resident_bytes": int(self.matrix.nbytes)}
+
+
+def make_backend(name: str):
+    if name == "python":
+        return PythonBackend(int(os.environ.get("WORDLE_ROW_CACHE_BYTES", DEFAULT_ROW_CACHE_BYTES)))
+    if name == "numpy":
+        return NumpyBackend(int(os.environ.get("WORDLE_ROW_CACHE_BYTES", DEFAULT_ROW_CACHE_BYTES)))
+    if name == "matrix":
+        return MatrixBackend(rebuild=os.environ.get("WORDLE_REBUILD_STALE", "1") != "0")
+    raise ValueError(f"unknown feedback backend {name!r} (choose from {', '.join(BACKENDS)})")
+
+
+@lru_cache(maxsize=None)
+def get_engine(name: Optional[str] = None):
+    """
+    The process-wide feedback engine. Defaults to WORDLE_FEEDBACK_BACKEND, or
+    'numpy' when only WORDLE_ROW_CACHE_BYTES is set, else 'matrix'.
+    """
+    if name is None:
+        name = os.environ.get("WORDLE_FEEDBACK_BACKEND")
+    if name is None:
+        name = "numpy" if os.environ.get("WORDLE_ROW_CACHE_BYTES") else "matrix"
+    return make_backend(name)
+
+
+# =============================================================================
+# Pair cache
+# =============================================================================
+
+@lru_cache(maxsize=65_536)
+def _word_key(word: str) -> int:
+    """5 letters x 5 bits -> 25-bit int, so a (guess, answer) pair packs into 50 bits."""
+    k = 0
+    for ch in word:
+        k = (k << 5) | (ord(ch) - 97)
+    return k
+
+
+class FeedbackCache:
+    """
+    Bounded (guess, answer) -> pattern cache in front of a feedback engine.
+
+    Storage is two flat arrays (int64 packed pair key + uint8 pattern, 9 bytes
+    per slot) sized from 'budget_bytes'; slots are direct-mapped by a
+    multiplicative hash, and a colliding insert evicts the previous entry.
+    Safe to share across threads within a worker.
+    """
+    _GOLDEN = 0x9E3779B97F4A7C15
+    _MASK64 = (1 << 64) - 1
+    SLOT_BYTES = 9
+
+    def __init__(self, engine, budget_bytes: int):
+        self.engine = engine
+        bits = max(4, (max(1, budget_bytes // self.SLOT_BYTES)).bit_length() - 1)
+        self._shift = 64 - bits
+        self.slots = 1 << bits
+        self._keys = np.full(self.slots, -1, dtype=np.int64)
+        self._vals = np.zeros(self.slots, dtype=np.uint8)
+        self._lock = threading.Lock()
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def pattern(self, guess: str, answer: str) -> int:
+        key = (_word_key(guess) << 25) | _word_key(answer)
+        slot = ((key * self._GOLDEN) & self._MASK64) >> self._shift
+        with self._lock:
+            if self._keys[slot] == key:
+                self.hits += 1
+                return int(self._vals[slot])
+            self.misses += 1
+
+        p = self.engine.pattern(guess, answer)
+        with self._lock:
+            old = self._keys[slot]
+            if old == -1:
+                self.used += 1
+            elif old != key:
+                self.evictions += 1
+            self._keys[slot] = key
+            self._vals[slot] = p
+        return p
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+                "resident_bytes": self.used * self.SLOT_BYTES,
+                "budget_bytes": self.slots * self.SLOT_BYTES,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_feedback_cache() -> FeedbackCache:
+    """Process-wide pair cache over get_engine(), sized by WORDLE_FEEDBACK_CACHE_BYTES."""
+    budget = int(os.environ.get("WORDLE_FEEDBACK_CACHE_BYTES", DEFAULT_FEEDBACK_CACHE_BYTES))
+    return FeedbackCache(get_engine(), budget)
+
+
+# =============================================================================
+# Equivalence / speed harness
+# =============================================================================
+
+def check(names=BACKENDS, guess_limit: Optional[int] = None, pairs: int = 20_000) -> bool:
+    """
+    Compare every backend's rows over the guess x answer space (all guesses,
+    or a random 'guess_limit' of them), a block() of those guesses over a
+    random sample of answer columns, and 'pairs' random pattern() calls.
+    Prints throughput per backend; returns True if all are bit-identical.
+    """
+    guess_ids = list(range(len(WORDS)))
+    if guess_limit is not None and guess_limit < len(guess_ids):
+        guess_ids = sorted(random.sample(guess_ids, guess_limit))
+    pair_list = [(random.choice(WORDS), random.choice(WORDS[:N_ANSWERS])) for _ in range(pairs)]
+    cols = np.array(sorted(random.sample(range(N_ANSWERS), min(N_ANSWERS, 500))))
+
+    ok = True
+    ref_rows = ref_pairs = None
+    for name in names:
+        # rows and pairs are computed directly, not through the row cache
+        backend = make_backend(name)
+        compute = getattr(backend, "_compute_row", backend.row)
+        pair = getattr(backend, "_pair", backend.pattern)
+
+        t0 = time.perf_counter()
+        block = np.empty((len(guess_ids), N_ANSWERS), dtype=np.uint8)
+        for k, g in enumerate(guess_ids):
+            block[k] = compute(g)
+        row_secs = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        sub = backend.block(guess_ids, cols)
+        block_secs = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        pats = np.fromiter((pair(g, a) for g, a in pair_list), dtype=np.uint8, count=pairs)
+        pair_secs = time.perf_counter() - t0
+
+        if ref_rows is None:
+            ref_rows, ref_pairs = block, pats
+        same = (np.array_equal(block, ref_rows) and np.array_equal(sub, ref_rows[:, cols])
+                and np.array_equal(pats, ref_pairs))
+        ok &= same
+        print(f"{name:>7}: rows {block.size / max(row_secs, 1e-9):>14,.0f} patterns/s | "
+              f"blocks {sub.size / max(block_secs, 1e-9):>14,.0f} patterns/s | "
+              f"pairs {pairs / max(pair_secs, 1e-9):>12,.0f}/s | "
+              f"{'identical' if same else 'MISMATCH'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feedback backends: equivalence and speed check.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    chk = sub.add_parser("check", help="Check all backends agree and report throughput.")
+    chk.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    chk.add_argument("--guesses", type=int, default=None,
+                     help="Check a random subset of guesses (default: all).")
+    chk.add_argument("--pairs", type=int, default=20_000)
+    chk.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    # put the reference first: the matrix when it is being checked
+    names = sorted(args.backends, key=lambda n: n != "matrix")
+    raise SystemExit(0 if check(names, args.guesses, args.pairs) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+NYT hard mode: which guesses a history still allows.
+
+In hard mode every revealed hint has to be used: a green letter stays at
+its position, and a letter shown green or yellow k times in one guess must
+appear at least k times in every later guess. So the legal pool is
+
+  AND of AT[i][l]       for each green (position i, letter l)
+  AND of AT_LEAST[l][k] for each letter l shown k times in one guess
+
+over bitsets of word ids (bit i set = WORDS[i] qualifies), built once over
+the whole valid list by ConstraintIndex, which makes a pool a handful of
+big-int ANDs however long the history is.
+
+The solver's easy_mode=False (guess only from the candidates) is stricter
+than this; NYT hard mode is the ordinary search over legal_pool(history).
+"""
+from __future__ import annotations
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+from candidates import mask_from_bools
+from patterns import WORD_LEN, encode_words
+from words import ID_DTYPE, LETTERS, N_WORDS, WORD_ID
+
+_N_BYTES = (N_WORDS + 7) // 8
+_POW3 = 3 ** np.arange(WORD_LEN)
+
+
+class ConstraintIndex:
+    """Per-position letter bitsets and per-letter minimum-count bitsets over every valid word."""
+
+    def __init__(self, letters: np.ndarray = LETTERS):
+        # at[i][l]: words with letter l at position i
+        self.at = [[mask_from_bools(letters[:, i] == l) for l in range(26)] for i in range(WORD_LEN)]
+        counts = (letters[:, :, None] == np.arange(26)).sum(axis=1)
+        # at_least[l][k]: words with at least k copies of letter l (k = 0 is every word)
+        self.at_least = [[mask_from_bools(counts[:, l] >= k) for k in range(WORD_LEN + 1)]
+                         for l in range(26)]
+        self.all = (1 << len(letters)) - 1
+
+    def pool_bits(self, history: Iterable[Tuple[object, int]]) -> int:
+        """Bitset of the guesses legal after [(guess, pattern code), ...]."""
+        greens: set = set()
+        need: Dict[int, int] = {}
+        for guess, code in history:
+            word = LETTERS[guess] if not isinstance(guess, str) else encode_words([guess])[0]
+            marks = (code // _POW3) % 3
+            shown: Dict[int, int] = {}
+            for i, (l, m) in enumerate(zip(word.tolist(), marks.tolist())):
+                if m == 2:
+                    greens.add((i, l))
+                if m:
+                    shown[l] = shown.get(l, 0) + 1
+            for l, k in shown.items():
+                need[l] = max(need.get(l, 0), k)
+        bits = self.all
+        for i, l in greens:
+            bits &= self.at[i][l]
+        for l, k in need.items():
+            bits &= self.at_least[l][k]
+        return bits
+
+
+@lru_cache(maxsize=None)
+def get_index() -> ConstraintIndex:
+    """The process-wide index over the valid word list (built on first use)."""
+    return ConstraintIndex()
+
+
+def ids_from_bits(bits: int) -> np.ndarray:
+    """Word ids of a bitset from ConstraintIndex, as a sorted id array."""
+    raw = np.frombuffer(bits.to_bytes(_N_BYTES, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder='little', count=N_WORDS)).astype(ID_DTYPE)
+
+
+def legal_pool(history: Iterable[Tuple[object, int]]) -> np.ndarray:
+    """
+    Ids of every valid guess that hard mode allows after 'history', a list
+    of (guess id or word, pattern code).
+    """
+    return ids_from_bits(get_index().pool_bits(
+        (WORD_ID.get(g, g) if isinstance(g, str) else g, p) for g, p in history))
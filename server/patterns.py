@@ -0,0 +1,240 @@
+"""
+Guess x answer feedback patterns as a precomputed byte matrix.
+
+A pattern is stored as a base-3 number, one digit per position
+(B=0, Y=1, G=2, position 0 is the least significant digit), so every
+pattern fits in one byte (0..242). The full matrix is built once, saved
+to disk and memory-mapped at startup so every worker shares the pages.
+
+The file starts with a small header carrying a format version and a hash
+of the word lists it was built from; loaders compare both against the
+current lists and rebuild (or refuse) stale files.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import os
+import struct
+from typing import Optional, Sequence
+
+import numpy as np
+
+WORD_LEN = 5
+PATTERN_COUNT = 3 ** WORD_LEN
+ALL_GREEN = PATTERN_COUNT - 1
+_POW3 = [3 ** i for i in range(WORD_LEN)]
+_DIGITS = {'B': 0, 'Y': 1, 'G': 2}
+# Where the matrix artifact lives; override with WORDLE_PATTERN_MATRIX.
+MATRIX_PATH = os.environ.get(
+    "WORDLE_PATTERN_MATRIX",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "pattern_matrix.bin"),
+)
+FORMAT_VERSION = 1
+_MAGIC = b"WRDLPAT\0"
+_HEADER = struct.Struct("<8sIII32s")  # magic, version, rows, cols, word-list sha256
+HEADER_BYTES = 64
+_STRINGS = [''.join('BYG'[(code // p) % 3] for p in _POW3) for code in range(PATTERN_COUNT)]
+
+
+class StaleArtifactError(ValueError):
+    """A precomputed file does not match the current word lists or format."""
+
+
+def wordlist_digest(guesses: Sequence[str], answers: Sequence[str]) -> bytes:
+    """sha256 of the normalized, ordered word lists (order defines the ids)."""
+    h = hashlib.sha256()
+    h.update(f"{len(guesses)} {len(answers)}\n".encode())
+    h.update("\n".join(guesses).encode())
+    h.update(b"\n--\n")
+    h.update("\n".join(answers).encode())
+    return h.digest()
+
+
+def pattern_code(digits: Sequence[int]) -> int:
+    """Per-position digits (B=0, Y=1, G=2) -> integer code."""
+    return digits[0] + 3 * digits[1] + 9 * digits[2] + 27 * digits[3] + 81 * digits[4]
+
+
+def encode_pattern(pattern: str) -> int:
+    """'BYGBB' -> integer code in [0, 243)."""
+    p = pattern.upper()
+    if len(p) != WORD_LEN or any(ch not in _DIGITS for ch in p):
+        raise ValueError(f"bad pattern {pattern!r}")
+    return sum(_DIGITS[ch] * w for ch, w in zip(p, _POW3))
+
+
+def decode_pattern(code: int) -> str:
+    """Integer code -> 'BYGBB'."""
+    return _STRINGS[code]
+
+
+def encode_words(words: Sequence[str]) -> np.ndarray:
+    """Words -> (N, 5) uint8 array of letter indexes ('a' = 0)."""
+    if not words:
+        return np.zeros((0, WORD_LEN), dtype=np.uint8)
+    raw = np.frombuffer(''.join(words).encode('ascii'), dtype=np.uint8)
+    return raw.reshape(-1, WORD_LEN) - ord('a')
+
+
+def feedback_codes(guess: str | np.ndarray, answers: np.ndarray) -> np.ndarray:
+    """
+    Pattern codes of one guess against every row of 'answers', an (N, 5)
+    uint8 array from encode_words, in a single vectorized pass.
+    Same duplicate-letter rules as solver.feedback_pattern: greens first,
+    then yellows left to right while unmatched answer letters remain.
+    """
+    if isinstance(guess, str):
+        guess = encode_words([guess.lower()])[0]
+    green = answers == guess
+    open_ = ~green
+    codes = np.zeros(len(answers), dtype=np.uint8)
+    for i in range(WORD_LEN):
+        ch = guess[i]
+        # copies of ch in the answer that are not already green
+        avail = ((answers == ch) & open_).sum(axis=1)
+        # earlier non-green copies of ch in the guess claim yellows first
+        used = open_[:, :i][:, guess[:i] == ch].sum(axis=1)
+        yellow = open_[:, i] & (used < avail)
+        codes += ((green[:, i] * 2) + yellow).astype(np.uint8) * np.uint8(_POW3[i])
+    return codes
+
+
+def letter_counts(answers: np.ndarray) -> np.ndarray:
+    """(26, N) int8 copies of each letter in each row of 'answers' (from encode_words)."""
+    return (answers[None, :, :] == np.arange(26, dtype=answers.dtype)[:, None, None]).sum(axis=2, dtype=np.int8)
+
+
+def feedback_block(guesses: np.ndarray, answers: np.ndarray,
+                   counts: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    (len(guesses), len(answers)) pattern codes, both (N, 5) uint8 arrays
+    from encode_words, with the rules of feedback_codes but every guess at
+    once. A non-green guess letter is yellow while the answer has copies
+    left: its count in the answer ('counts', letter_counts(answers), if the
+    caller keeps one), less every earlier copy in the guess (green or
+    yellow, each claims one) and every later copy that is green.
+    """
+    if counts is None:
+        counts = letter_counts(answers)
+    green = [answers[:, i] == guesses[:, i, None] for i in range(WORD_LEN)]
+    codes = np.zeros((len(guesses), len(answers)), dtype=np.uint8)
+    for i in range(WORD_LEN):
+        same = guesses == guesses[:, i, None]
+        left = counts[guesses[:, i]] - same[:, :i].sum(axis=1, dtype=np.int8)[:, None]
+        for j in range(i + 1, WORD_LEN):
+            if same[:, j].any():
+                left -= green[j] & same[:, j, None]
+        codes += np.where(green[i], np.uint8(2 * _POW3[i]), (left > 0).astype(np.uint8) * np.uint8(_POW3[i]))
+    return codes
+
+
+def build_matrix(guesses: Sequence[str], answers: Sequence[str]) -> np.ndarray:
+    """Full (len(guesses), len(answers)) uint8 pattern matrix."""
+    g_enc = encode_words(guesses)
+    a_enc = encode_words(answers)
+    out = np.empty((len(g_enc), len(a_enc)), dtype=np.uint8)
+    for gi in range(len(g_enc)):
+        out[gi] = feedback_codes(g_enc[gi], a_enc)
+    return out
+
+
+# ---- building the artifact ---------------------------------------------------
+# Workers share one memory-mapped output file and write their row ranges
+# in place, so nothing is pickled back to the parent.
+
+_worker_guesses = None
+_worker_answers = None
+_worker_path = None
+
+
+def _init_worker(path: str, g_enc: np.ndarray, a_enc: np.ndarray) -> None:
+    global _worker_guesses, _worker_answers, _worker_path
+    _worker_path, _worker_guesses, _worker_answers = path, g_enc, a_enc
+
+
+def _fill_rows(bounds) -> int:
+    lo, hi = bounds
+    out = np.memmap(_worker_path, dtype=np.uint8, mode='r+', offset=HEADER_BYTES,
+                    shape=(len(_worker_guesses), len(_worker_answers)))
+    for gi in range(lo, hi):
+        out[gi] = feedback_codes(_worker_guesses[gi], _worker_answers)
+    out.flush()
+    del out
+    return hi - lo
+
+
+def build_matrix_file(path: str,
+                      guesses: Sequence[str],
+                      answers: Sequence[str],
+                      workers: Optional[int] = None) -> None:
+    """
+    Build the (guesses, answers) matrix straight into the file at 'path',
+    splitting the guess list across 'workers' processes (default: all cores).
+    Written to a temp file and renamed, so concurrently starting servers
+    never see a partial matrix.
+    """
+    g_enc = encode_words(guesses)
+    a_enc = encode_words(answers)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    header = _HEADER.pack(_MAGIC, FORMAT_VERSION, len(g_enc), len(a_enc),
+                          wordlist_digest(guesses, answers))
+    with open(tmp, 'wb') as fh:
+        fh.write(header.ljust(HEADER_BYTES, b"\0"))
+        fh.truncate(HEADER_BYTES + len(g_enc) * len(a_enc))
+
+    workers = workers or os.cpu_count() or 1
+    n = len(g_enc)
+    step = max(1, -(-n // (workers * 8)))
+    chunks = [(lo, min(n, lo + step)) for lo in range(0, n, step)]
+    try:
+        if workers == 1:
+            _init_worker(tmp, g_enc, a_enc)
+            for c in chunks:
+                _fill_rows(c)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(tmp, g_enc, a_enc)) as pool:
+                for _ in pool.map(_fill_rows, chunks):
+                    pass
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def check_matrix(path: str, guesses: Sequence[str], answers: Sequence[str]) -> Optional[str]:
+    """Why the file at 'path' can't be used for these lists, or None if it is current."""
+    if not os.path.exists(path):
+        return "missing"
+    with open(path, 'rb') as fh:
+        raw = fh.read(_HEADER.size)
+    if len(raw) < _HEADER.size:
+        return "truncated header"
+    magic, version, rows, cols, digest = _HEADER.unpack(raw)
+    if magic != _MAGIC:
+        return "not a pattern matrix"
+    if version != FORMAT_VERSION:
+        return f"format version {version}, expected {FORMAT_VERSION}"
+    if (rows, cols) != (len(guesses), len(answers)) or digest != wordlist_digest(guesses, answers):
+        return "built from different word lists"
+    if os.path.getsize(path) != HEADER_BYTES + rows * cols:
+        return "truncated data"
+    return None
+
+
+def load_matrix(path: str,
+                guesses: Sequence[str],
+                answers: Sequence[str],
+                workers: Optional[int] = None,
+                rebuild: bool = True) -> np.ndarray:
+    """
+    Memory-map the matrix at 'path'. A missing or stale file is rebuilt,
+    or, with rebuild=False, rejected with StaleArtifactError.
+    """
+    reason = check_matrix(path, guesses, answers)
+    if reason is not None:
+        if not rebuild:
+            raise StaleArtifactError(f"{path}: {reason} (run build_patterns.py)")
+        build_matrix_file(path, guesses, answers, workers=workers)
+    return np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER_BYTES,
+                     shape=(len(guesses), len(answers)))
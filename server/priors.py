@@ -0,0 +1,77 @@
+"""
+Answer priors: optional per-answer weights for scoring and the endgame.
+
+By default every candidate is equally likely. A priors file makes some
+answers likelier than others; it is plain text, one "word weight" per line
+(blank lines and '#' comments are skipped), read from WORDLE_ANSWER_PRIORS
+or answer_priors.txt next to this file. Answers the file does not list
+get the smallest weight it does list, words that are not answers are
+ignored, and weights are rescaled to average 1 over the answers, so a
+weighted bucket mass reads as a candidate count and uniform weights score
+exactly like no file at all. Weights are then raised to at least
+MIN_WEIGHT: a weight of 0 would let a history leave candidates with no
+mass at all, and every score divides by the mass.
+
+get_priors() is a float array over word ids (0 for the guesses that are
+not answers) or None without a file; scoring takes it as 'prior' and
+reads the candidates' weights off it with one fancy index.
+"""
+from __future__ import annotations
+from functools import lru_cache
+import hashlib
+import os
+from typing import Optional
+
+import numpy as np
+
+from words import N_ANSWERS, N_WORDS, WORD_ID
+
+PRIORS_PATH = os.environ.get(
+    "WORDLE_ANSWER_PRIORS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "answer_priors.txt"),
+)
+# smallest weight after rescaling (the average is 1)
+MIN_WEIGHT = 1e-6
+
+
+def load_priors(path: str = PRIORS_PATH) -> Optional[np.ndarray]:
+    """Weights over word ids from the file at 'path', or None if there is no file."""
+    if not path or not os.path.exists(path):
+        return None
+    raw = np.full(N_ANSWERS, np.nan)
+    with open(path) as fh:
+        for lineno, line in enumerate(fh, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            try:
+                word, weight = line.split()
+                weight = float(weight)
+            except ValueError:
+                raise ValueError(f"{path}:{lineno}: expected 'word weight', got {line!r}") from None
+            if not weight >= 0 or weight == float('inf'):
+                raise ValueError(f"{path}:{lineno}: weight must be finite and >= 0, got {weight!r}")
+            i = WORD_ID.get(word.lower())
+            if i is not None and i < N_ANSWERS:
+                raw[i] = weight
+    listed = raw[~np.isnan(raw)]
+    if not len(listed) or not listed.sum() > 0:
+        raise ValueError(f"{path}: no answer has a positive weight")
+    raw[np.isnan(raw)] = listed.min()
+    weights = np.zeros(N_WORDS)
+    weights[:N_ANSWERS] = np.maximum(raw * (N_ANSWERS / raw.sum()), MIN_WEIGHT)
+    weights.flags.writeable = False
+    return weights
+
+
+def priors_version(weights: Optional[np.ndarray]) -> Optional[str]:
+    """Short digest of a weight array (None for uniform), for cache keys."""
+    if weights is None:
+        return None
+    return hashlib.blake2b(np.ascontiguousarray(weights).tobytes(), digest_size=8).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_priors() -> Optional[np.ndarray]:
+    """The weights at PRIORS_PATH, loaded once per process (None if there is no file)."""
+    return load_priors(PRIORS_PATH)
@@ -0,0 +1,59 @@
+"""
+Bounded row cache for feedback backends that don't hold the full matrix.
+
+A row is one guess's pattern codes against every answer (row(g)[a], ids as
+in words.py). Rows are computed on first use and kept in an LRU bounded by
+a byte budget, so popular guesses stay hot without the full matrix cost.
+Only single-row lookups go through it: the backends compute bulk blocks
+directly (see feedback.py), since a pass over the pool would flush it.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+import threading
+from typing import Callable, Dict
+
+import numpy as np
+
+
+class RowCache:
+    """Rows from 'compute(guess_id)' kept in an LRU bounded by 'budget_bytes'."""
+
+    def __init__(self, compute: Callable[[int], np.ndarray], row_bytes: int, budget_bytes: int):
+        self._compute = compute
+        self.row_bytes = row_bytes
+        self.capacity = max(1, budget_bytes // max(1, row_bytes))
+        self._rows: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def row(self, guess_id: int) -> np.ndarray:
+        with self._lock:
+            r = self._rows.get(guess_id)
+            if r is not None:
+                self._rows.move_to_end(guess_id)
+                self.hits += 1
+                return r
+            self.misses += 1
+
+        r = self._compute(guess_id)
+        r.flags.writeable = False
+        with self._lock:
+            self._rows[guess_id] = r
+            self._rows.move_to_end(guess_id)
+            while len(self._rows) > self.capacity:
+                self._rows.popitem(last=False)
+                self.evictions += 1
+        return r
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            resident = len(self._rows) * self.row_bytes
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "resident_bytes": resident,
+            "budget_bytes": self.capacity * self.row_bytes,
+        }
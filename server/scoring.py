@@ -0,0 +1,493 @@
+"""
+Batched guess scoring over pattern rows.
+
+Every objective the solver uses is a function of a guess's bucket
+histogram: how many current candidates land in each of the 243 patterns.
+iter_histograms builds those histograms for a whole guess pool with one
+np.bincount per chunk of guesses, so scoring every valid guess exactly is
+a handful of array operations rather than a Python loop per guess.
+
+Objectives (all lower-is-better, all read off the same histograms):
+  expected  Σ|B|²/n, the expected number of candidates left
+  entropy   -H, with H = log2 n - Σ|B| log2|B| / n bits of information
+  blend     w * expected + (1 - w) * n / 2^H; n / 2^H is the candidate
+            count the entropy is worth, so both terms are in the same units
+  minimax   max|B| + Σ|B|²/(n² + 1): the largest bucket (a guaranteed bound
+            on what is left), with expected remaining folded into the
+            fraction as the tie-breaker since Σ|B|² <= n²
+
+With answer priors (priors.py) the functions below take 'prior', a weight
+per word id. A bucket then holds the mass of its candidates rather than
+their count, n is the total mass, and the objectives are read off those
+masses unchanged. The weighted histograms come out of the same bincount
+(the candidates' weights as its parallel 'weights' array), and ties
+between candidates go to the heavier one.
+"""
+from __future__ import annotations
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from patterns import ALL_GREEN, PATTERN_COUNT
+from words import N_ANSWERS
+
+OBJECTIVES = ("expected", "entropy", "blend", "minimax")
+DEFAULT_BLEND = 0.5
+
+# Guesses per histogram chunk: keeps each chunk's (chunk, 243) histogram
+# cache-sized instead of materializing one for the whole pool.
+CHUNK_GUESSES = 256
+
+# _XLOGX[c] = c * log2(c), so entropy is a table lookup per bucket
+_XLOGX = np.zeros(N_ANSWERS + 1)
+_XLOGX[1:] = np.arange(1, N_ANSWERS + 1) * np.log2(np.arange(1, N_ANSWERS + 1))
+
+
+def check_objective(objective: str, blend: float = DEFAULT_BLEND) -> None:
+    if objective not in OBJECTIVES:
+        raise ValueError(f"unknown objective {objective!r} (choose from {', '.join(OBJECTIVES)})")
+    if not 0.0 <= blend <= 1.0:
+        raise ValueError(f"blend weight must be in [0, 1], got {blend!r}")
+
+
+def iter_histograms(engine, pool_ids: np.ndarray, cand_ids: np.ndarray,
+                    weights: Optional[np.ndarray] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield (offset, (chunk, 243) int64 counts of candidates per pattern) over
+    the pool; with 'weights' (one per candidate) float64 masses instead.
+    """
+    tiled = _tiled(weights)
+    for lo in range(0, len(pool_ids), CHUNK_GUESSES):
+        block = engine.block(pool_ids[lo:lo + CHUNK_GUESSES], cand_ids)
+        yield lo, block_histograms(block, _rows(tiled, block.size))
+
+
+def block_histograms(block: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    (guesses, 243) counts of candidates per pattern for a (guesses,
+    candidates) pattern block; with 'weights' (parallel to the flattened
+    block) float64 masses instead.
+    """
+    # give every guess its own 243-wide range so one bincount covers the block
+    offsets = (np.arange(len(block), dtype=np.int64) * PATTERN_COUNT)[:, None]
+    counts = np.bincount((block + offsets).ravel(), weights=weights, minlength=len(block) * PATTERN_COUNT)
+    return counts.reshape(len(block), PATTERN_COUNT)
+
+
+def _tiled(weights: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """
+    Per-candidate weights repeated for a whole chunk of guesses: bincount's
+    parallel array, built once per pass (tiling per chunk costs a third of
+    the pass).
+    """
+    return None if weights is None else np.tile(weights, CHUNK_GUESSES)
+
+
+def _rows(tiled: Optional[np.ndarray], size: int) -> Optional[np.ndarray]:
+    return None if tiled is None else tiled[:size]
+
+
+def candidate_mass(cand_ids: np.ndarray, prior: Optional[np.ndarray] = None):
+    """(weights of the candidates or None, n): n is the count, or the total mass with a prior."""
+    if prior is None:
+        return None, len(cand_ids)
+    weights = prior[cand_ids]
+    return weights, float(weights.sum())
+
+
+def tie_order(ids: np.ndarray, scores: np.ndarray, is_cand: np.ndarray,
+              prior: Optional[np.ndarray] = None) -> np.ndarray:
+    """Indexes of 'ids' best first: by score, then candidates (heaviest prior first), then id."""
+    if prior is None:
+        return np.lexsort((ids, ~is_cand[ids], scores))
+    return np.lexsort((ids, -np.where(is_cand[ids], prior[ids], 0.0), ~is_cand[ids], scores))
+
+
+def sum_squares(hist: np.ndarray) -> np.ndarray:
+    """
+    Σ|B|² per guess; expected remaining is this divided by n (exact integers
+    for counts, so ties are exact).
+    """
+    return np.einsum('ij,ij->i', hist, hist)
+
+
+def entropy(hist: np.ndarray, n: int) -> np.ndarray:
+    """Shannon entropy in bits of each guess's pattern distribution over n candidates (or mass n)."""
+    if hist.dtype.kind == 'f':
+        if n <= 0:
+            return np.zeros(len(hist))
+        # masses are not table indexes
+        xlogx = hist * np.log2(np.where(hist > 0, hist, 1.0))
+        return np.log2(n) - xlogx.sum(axis=1) / n
+    if n <= 1:
+        return np.zeros(len(hist))
+    return np.log2(n) - _XLOGX[hist].sum(axis=1) / n
+
+
+def worst_case(hist: np.ndarray) -> np.ndarray:
+    """Largest bucket per guess: the most candidates (or mass) that can remain after it."""
+    return hist.max(axis=1)
+
+
+def objective_scores(hist: np.ndarray, n: float, objective: str = "expected",
+                     blend: float = DEFAULT_BLEND) -> np.ndarray:
+    """Per-guess score for 'objective' from (k, 243) histograms over n candidates (or mass n)."""
+    if objective == "expected":
+        return sum_squares(hist) / n
+    if objective == "entropy":
+        return -entropy(hist, n)
+    if objective == "blend":
+        return blend * (sum_squares(hist) / n) + (1.0 - blend) * n / np.exp2(entropy(hist, n))
+    if objective == "minimax":
+        return worst_case(hist) + sum_squares(hist) / (n * n + 1.0)
+    check_objective(objective, blend)
+    raise AssertionError("unreachable")
+
+
+def pool_scores(engine, pool_ids: np.ndarray, cand_ids: np.ndarray,
+                objective: str = "expected", blend: float = DEFAULT_BLEND,
+                prior: Optional[np.ndarray] = None) -> np.ndarray:
+    """'objective' for every pool guess, reduced chunk by chunk."""
+    out = np.empty(len(pool_ids))
+    weights, n = candidate_mass(cand_ids, prior)
+    for lo, hist in iter_histograms(engine, pool_ids, cand_ids, weights):
+        out[lo:lo + len(hist)] = objective_scores(hist, n, objective, blend)
+    return out
+
+
+def best_guess(engine, pool_ids: np.ndarray, cand_ids: np.ndarray, is_cand: np.ndarray,
+               objective: str = "expected", blend: float = DEFAULT_BLEND,
+               deadline: Optional[float] = None, prune: bool = True,
+               prior: Optional[np.ndarray] = None) -> Tuple[int, float, bool]:
+    """
+    Argmin of 'objective' over the pool: (guess id, score, complete). Chunks
+    are scored in pool order, so put the most promising guesses first; with
+    a 'deadline' (a time.perf_counter() value) the clock is checked after
+    each chunk and the best guess so far is returned with complete=False
+    once it passes. Ties prefer candidates (the heaviest, with a 'prior'),
+    then the lowest id, whatever the order, so a complete search gives the
+    same answer as a sorted pool. With 'prune', guesses are dropped
+    part-way through the candidates once they can no longer beat the best
+    so far (see _pruned_histograms).
+    """
+    weights, n = candidate_mass(cand_ids, prior)
+    best = None
+    if prune and objective in PRUNE_OBJECTIVES and len(cand_ids) >= PRUNE_MIN_CANDIDATES:
+        chunks = _pruned_histograms(engine, pool_ids, cand_ids, objective, blend, lambda: best, weights)
+    else:
+        chunks = ((lo, pool_ids[lo:lo + len(h)], h)
+                  for lo, h in iter_histograms(engine, pool_ids, cand_ids, weights))
+    for lo, chunk, hist in chunks:
+        if len(chunk):
+            scores = objective_scores(hist, n, objective, blend)
+            i = tie_order(chunk, scores, is_cand, prior)[0]
+            g = int(chunk[i])
+            top = (float(scores[i]), not is_cand[g], -float(prior[g]) if prior is not None else 0.0, g)
+            best = top if best is None or top < best else best
+        if deadline is not None and lo + CHUNK_GUESSES < len(pool_ids) and time.perf_counter() > deadline:
+            return best[3], best[0], False
+    return best[3], best[0], True
+
+
+def top_guesses(engine, pool_ids: np.ndarray, cand_ids: np.ndarray, is_cand: np.ndarray, k: int,
+                objective: str = "expected", blend: float = DEFAULT_BLEND,
+                prior: Optional[np.ndarray] = None, deadline: Optional[float] = None) -> Tuple:
+    """
+    The k best pool guesses in one pass, best first, as parallel arrays
+    (ids, scores, worst bucket, bucket count) followed by a complete flag,
+    ordered like best_guess (score, then candidates, then id). Each chunk
+    is cut to its best k with np.argpartition and merged into the running
+    k, so only the final k are ever fully sorted. With a 'prior' the worst
+    bucket is a mass. With a 'deadline' (as in best_guess) the clock is
+    checked after each chunk, and once it passes the best k of the chunks
+    scored so far come back with complete=False.
+    """
+    weights, n = candidate_mass(cand_ids, prior)
+    kept = None
+    complete = True
+    for lo, hist in iter_histograms(engine, pool_ids, cand_ids, weights):
+        part = (pool_ids[lo:lo + len(hist)], objective_scores(hist, n, objective, blend),
+                worst_case(hist), np.count_nonzero(hist, axis=1))
+        if kept is not None:
+            if len(kept[0]) == k:
+                # only guesses at or under the current k-th score can get in
+                inside = part[1] <= kept[1].max()
+                part = tuple(a[inside] for a in part)
+            part = tuple(np.concatenate(pair) for pair in zip(kept, part))
+        kept = _smallest(part, is_cand, k, prior)
+        if deadline is not None and lo + CHUNK_GUESSES < len(pool_ids) and time.perf_counter() > deadline:
+            complete = False
+            break
+    order = tie_order(kept[0], kept[1], is_cand, prior)
+    return tuple(a[order] for a in kept) + (complete,)
+
+
+def _smallest(part, is_cand: np.ndarray, k: int, prior: Optional[np.ndarray] = None):
+    """The k best of (ids, scores, ...) in tie_order, unordered."""
+    ids, scores = part[0], part[1]
+    if len(ids) <= k:
+        return part
+    # everything tied with the k-th score goes through, so the tie-break stays exact
+    cut = scores[np.argpartition(scores, k - 1)[k - 1]]
+    near = np.flatnonzero(scores <= cut)
+    if len(near) > k:
+        near = near[tie_order(ids[near], scores[near], is_cand, prior)[:k]]
+    return tuple(a[near] for a in part)
+
+
+# ---- pruning --------------------------------------------------------------------
+# Bucket counts (or masses) only grow as candidates are added, and the
+# pruned objectives are non-decreasing in each, so a guess's score over a prefix of the
+# candidates is a lower bound on its final score. Candidates are fed in
+# PRUNE_BLOCKS column blocks and a guess is dropped once that bound is
+# strictly above the best complete score (strictly, so ties still reach the
+# candidate-preferring tie-break).
+
+PRUNE_BLOCKS = 4
+# below this many candidates one unpruned pass is cheaper than the per-block bookkeeping
+PRUNE_MIN_CANDIDATES = 1000
+# the entropy bound is weak on a prefix and costs a log-table pass per block,
+# so only the count-based objectives prune
+PRUNE_OBJECTIVES = ("expected", "minimax")
+
+
+class PruneStats:
+    """Counters for best_guess pruning: how many guesses stopped early, and where."""
+
+    def __init__(self, blocks: int = PRUNE_BLOCKS):
+        self._lock = threading.Lock()
+        self.blocks = blocks
+        self.guesses = 0
+        self.pruned_at = [0] * (blocks - 1)
+        self.cells = 0
+        self.cells_skipped = 0
+
+    def record(self, guesses: int, pruned_at, cells: int, skipped: int) -> None:
+        with self._lock:
+            self.guesses += guesses
+            for j, c in enumerate(pruned_at):
+                self.pruned_at[j] += c
+            self.cells += cells
+            self.cells_skipped += int(skipped)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pruned = sum(self.pruned_at)
+            return {
+                "guesses": self.guesses,
+                "pruned": pruned,
+                "prune_rate": pruned / self.guesses if self.guesses else 0.0,
+                # guesses pruned after seeing this fraction of the candidates
+                "pruned_at": {f"{(j + 1) / self.blocks:.2f}": c for j, c in enumerate(self.pruned_at)},
+                "work_saved": self.cells_skipped / self.cells if self.cells else 0.0,
+            }
+
+
+PRUNING = PruneStats()
+
+
+def _pruned_histograms(engine, pool_ids, cand_ids, objective, blend, incumbent, weights=None):
+    """
+    Yield (offset, surviving guess ids, their full histograms) per chunk of
+    the pool. 'incumbent()' is the caller's current best (score, ...) or None.
+    """
+    n = len(cand_ids)
+    total = n if weights is None else float(weights.sum())
+    edges = np.linspace(0, n, PRUNE_BLOCKS + 1).astype(int)
+    cols = [cand_ids[edges[j]:edges[j + 1]] for j in range(PRUNE_BLOCKS)]
+    col_weights = [_tiled(None if weights is None else weights[edges[j]:edges[j + 1]])
+                   for j in range(PRUNE_BLOCKS)]
+    # each remaining candidate adds at least its weight squared (1 without weights) to Σ|B|²
+    rest = [n - edges[j + 1] if weights is None else float((weights[edges[j + 1]:] ** 2).sum())
+            for j in range(PRUNE_BLOCKS)]
+    for lo in range(0, len(pool_ids), CHUNK_GUESSES):
+        chunk = pool_ids[lo:lo + CHUNK_GUESSES]
+        hist = np.zeros((len(chunk), PATTERN_COUNT), dtype=np.int64 if weights is None else np.float64)
+        alive = np.arange(len(chunk))
+        pruned_at = [0] * (PRUNE_BLOCKS - 1)
+        for j, col in enumerate(cols):
+            block = engine.block(chunk[alive], col)
+            hist[alive] += block_histograms(block, _rows(col_weights[j], block.size))
+            best = incumbent()
+            if j == PRUNE_BLOCKS - 1 or best is None:
+                continue
+            lb = objective_scores(hist[alive], total, objective, blend)
+            if objective == "expected":
+                lb = lb + rest[j] / total
+            keep = lb <= best[0]
+            pruned_at[j] = int(np.count_nonzero(~keep))
+            alive = alive[keep]
+            if not len(alive):
+                break
+        PRUNING.record(len(chunk), pruned_at, len(chunk) * n,
+                       sum(c * (n - edges[j + 1]) for j, c in enumerate(pruned_at)))
+        yield lo, chunk[alive], hist[alive]
+
+
+# ---- racing -------------------------------------------------------------------
+# Score every guess on a small random sample of the candidates, drop the
+# guesses whose optimistic bound is still worse than the leader's pessimistic
+# one, double the sample for the survivors, and repeat until one guess is
+# left or the sample is the whole set (where scores are exact).
+
+RACE_START = 64
+RACE_Z = 3.0
+
+
+def _estimates(hist: np.ndarray, m: int, n: int, objective: str,
+               blend: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (estimate, standard error) of each guess's full-set score from its
+    histogram over m of the n candidates, drawn without replacement.
+    """
+    if m == n:
+        return objective_scores(hist, n, objective, blend), np.zeros(len(hist))
+    fpc = (n - m) / (n - 1)
+    p = hist / m
+    s2 = np.einsum('ij,ij->i', p, p)
+    # unbiased for sampling without replacement; exact once m == n
+    exp_est = np.einsum('ij,ij->i', hist, hist - 1) * (n - 1) / (m * (m - 1)) + 1.0
+    exp_se = n * 2.0 * np.sqrt(np.maximum(np.einsum('ij,ij,ij->i', p, p, p) - s2 * s2, 0.0) * fpc / m)
+    if objective == "expected":
+        return exp_est, exp_se
+    if objective == "minimax":
+        pmax = hist.max(axis=1) / m
+        est = n * pmax + n * exp_est / (n * n + 1.0)
+        return est, n * np.sqrt(pmax * (1 - pmax) * fpc / m)
+
+    # plug-in entropy with the Miller-Madow bias correction; small samples
+    # of many-bucket guesses are still biased, so the correction is also
+    # counted as uncertainty
+    log_p = np.log2(np.where(hist > 0, p, 1.0))
+    h = -np.einsum('ij,ij->i', p, log_p)
+    mm = (np.count_nonzero(hist, axis=1) - 1) / (2 * m * np.log(2)) * fpc
+    h_se = np.sqrt(np.maximum(np.einsum('ij,ij,ij->i', p, log_p, log_p) - h * h, 0.0) * fpc / m) + mm
+    h += mm
+    if objective == "entropy":
+        return -h, h_se
+    eff = n / np.exp2(h)
+    return (blend * exp_est + (1.0 - blend) * eff,
+            blend * exp_se + (1.0 - blend) * np.log(2) * eff * h_se)
+
+
+def race(engine, pool_ids: np.ndarray, cand_ids: np.ndarray, is_cand: np.ndarray,
+         objective: str = "expected", blend: float = DEFAULT_BLEND,
+         order: Optional[np.ndarray] = None, start: int = RACE_START, z: float = RACE_Z,
+         deadline: Optional[float] = None) -> Tuple[int, float, bool]:
+    """
+    Racing argmin of 'objective': (guess id, score, complete). 'order' is a
+    random permutation of cand_ids (samples are its prefixes); the score is
+    exact if the race went to the full set, an estimate otherwise. With a
+    'deadline' the clock is checked after each chunk of a round, and once it
+    passes the leader among the guesses scored so far comes back with
+    complete=False (so put the most promising guesses first, as for
+    best_guess).
+    """
+    n = len(cand_ids)
+    if order is None:
+        order = np.random.permutation(cand_ids)
+    alive = pool_ids
+    m = min(start, n)
+    while True:
+        sample = np.sort(order[:m])
+        est = np.empty(len(alive))
+        se = np.empty(len(alive))
+        for lo, hist in iter_histograms(engine, alive, sample):
+            est[lo:lo + len(hist)], se[lo:lo + len(hist)] = _estimates(hist, m, n, objective, blend)
+            if deadline is not None and lo + CHUNK_GUESSES < len(alive) and time.perf_counter() > deadline:
+                scored, est = alive[:lo + len(hist)], est[:lo + len(hist)]
+                i = np.lexsort((scored, ~is_cand[scored], est))[0]
+                return int(scored[i]), float(est[i]), False
+        keep = est - z * se <= (est + z * se).min()
+        alive, est = alive[keep], est[keep]
+        if m == n or len(alive) == 1:
+            break
+        if deadline is not None and time.perf_counter() > deadline:
+            i = np.lexsort((alive, ~is_cand[alive], est))[0]
+            return int(alive[i]), float(est[i]), False
+        m = min(2 * m, n)
+    i = np.lexsort((alive, ~is_cand[alive], est))[0]
+    return int(alive[i]), float(est[i]), True
+
+
+# ---- equivalent guesses ---------------------------------------------------------
+# Two guesses whose patterns group the candidates into the same buckets get
+# the same score under every objective, whatever the pattern codes are. A
+# guess's signature is its pattern row relabeled canonically (each candidate
+# gets the index of the first candidate in its bucket), so equal signatures
+# are exactly equal partitions. A candidate can also win outright, which a
+# non-candidate with the same partition cannot (the tie-break and the
+# endgame price them differently), so only guesses that are both candidates
+# or both not are equivalent.
+
+# Relabeling sorts every row, so it costs a few scoring passes: worth it
+# where the classes are reused (a search expanding guesses, a shortlist),
+# not in front of a single pass.
+
+
+def partition_signatures(engine, pool_ids: np.ndarray, cand_ids: np.ndarray) -> np.ndarray:
+    """(len(pool), n) canonical bucket labels: candidate j -> first candidate in its bucket."""
+    n = len(cand_ids)
+    block = engine.block(pool_ids, cand_ids)
+    order = np.argsort(block, axis=1, kind='stable')
+    ordered = np.take_along_axis(block, order, axis=1)
+    starts = np.ones(ordered.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    # sorted position of each bucket's start; stable, so its first candidate sits there
+    start_at = np.maximum.accumulate(np.where(starts, np.arange(n), 0), axis=1)
+    labels = np.empty_like(order)
+    np.put_along_axis(labels, order, np.take_along_axis(order, start_at, axis=1), axis=1)
+    return labels.astype(np.uint8 if n <= 256 else np.uint16)
+
+
+def equivalence_classes(engine, pool_ids: np.ndarray, cand_ids: np.ndarray,
+                        is_cand: np.ndarray, prior: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (representative mask over the pool, representative index per pool guess).
+    Guesses with equal signatures form a class; its representative is its
+    first candidate (heaviest, with a 'prior'), else its lowest id, which is
+    the guess the tie-break would pick, so scoring only representatives
+    changes no result.
+    """
+    labels = partition_signatures(engine, pool_ids, cand_ids)
+    keyed = np.column_stack([labels, is_cand[pool_ids].astype(labels.dtype)])
+    order = tie_order(pool_ids, np.zeros(len(pool_ids)), is_cand, prior)
+    rows = np.ascontiguousarray(keyed[order]).view(np.dtype((np.void, keyed.itemsize * keyed.shape[1])))
+    _, first, inverse = np.unique(rows.ravel(), return_index=True, return_inverse=True)
+    rep_of = np.empty(len(pool_ids), dtype=np.intp)
+    rep_of[order] = order[first[inverse.ravel()]]
+    return rep_of == np.arange(len(pool_ids)), rep_of
+
+
+def equivalent_guesses(engine, guess_id: int, pool_ids: np.ndarray, cand_ids: np.ndarray,
+                       deadline: Optional[float] = None) -> Tuple[np.ndarray, bool]:
+    """
+    Pool guesses that split 'cand_ids' exactly like 'guess_id' (itself
+    included, if in the pool) and are candidates exactly when it is, in one
+    pass and no sorting: a guess that is constant on each of guess_id's
+    buckets splits at most as finely, and exactly as finely when its Σ|B|²
+    is the same (merging any two buckets raises it). Returns (ids,
+    complete); with a 'deadline' the clock is checked after each chunk and
+    the guesses found so far come back with complete=False once it passes.
+    """
+    row = engine.row(guess_id)[cand_ids]
+    order = np.argsort(row, kind='stable')
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = row[order][1:] != row[order][:-1]
+    lead = np.empty(len(order), dtype=np.intp)
+    lead[order] = order[np.flatnonzero(starts)[np.cumsum(starts) - 1]]
+    solves = bool((row == ALL_GREEN).any())
+    target = np.bincount(row, minlength=PATTERN_COUNT)
+    target = int(target @ target)
+    out = []
+    for lo in range(0, len(pool_ids), CHUNK_GUESSES):
+        chunk = pool_ids[lo:lo + CHUNK_GUESSES]
+        block = engine.block(chunk, cand_ids)
+        coarser = (block == block[:, lead]).all(axis=1) & ((block == ALL_GREEN).any(axis=1) == solves)
+        same = sum_squares(block_histograms(block[coarser])) == target
+        out.append(chunk[coarser][same])
+        if deadline is not None and lo + CHUNK_GUESSES < len(pool_ids) and time.perf_counter() > deadline:
+            return np.concatenate(out), False
+    return (np.concatenate(out) if out else pool_ids[:0]), True
@@ -0,0 +1,239 @@
+"""
+Branch-and-bound over candidate sets, shared by tree.py and endgame.py.
+
+Both look for the fewest total guesses to solve a set S,
+
+  cost(S) = mass(S) + Σ cost(S_p) over the non-solved buckets p of the guess
+
+where mass(S) is |S| (every answer in S pays for the guess) or, with answer
+priors, its weight. No set costs less than its floor, 2|S| - 1 (at best
+one answer is guessed outright). The floors of a guess's buckets bound it
+before any subtree is searched, and a subtree search stops as soon as it
+can no longer beat the best guess so far.
+
+BranchAndBound runs that search; a subclass says which guesses to try and
+how to key the memo. split_bounds gives both their guesses: one per
+distinct split of the set, each with its bound. Results are memoized per set: exact costs with their
+guess, plus lower bounds proven by searches that were cut off. A search
+given a deadline raises OutOfTime once it passes; sets whose search was
+interrupted store nothing, so the memo stays exact.
+"""
+from __future__ import annotations
+import time
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from candidates import CandidateSet
+from patterns import ALL_GREEN
+from scoring import block_histograms
+
+INF = float('inf')
+
+# (guess id, bound or None, pattern row over the set or None)
+Move = Tuple[int, Optional[float], Optional[np.ndarray]]
+
+
+class OutOfTime(Exception):
+    """
+    The deadline passed mid-search. 'guess' and 'cost' are the top-level
+    set's best guess so far and its cost, or, when no guess had finished,
+    the best-bounded guess and its bound.
+    """
+    guess: Optional[int] = None
+    cost: float = INF
+
+
+def lower_bound(n: int) -> int:
+    """Fewest total guesses any strategy can spend on n answers."""
+    return 2 * n - 1 if n else 0
+
+
+def perfect_candidate(engine, ids: np.ndarray) -> Optional[int]:
+    """A candidate that puts every candidate in its own bucket, if any."""
+    block = np.sort(engine.block(ids, ids), axis=1)
+    hits = np.flatnonzero((block[:, 1:] != block[:, :-1]).all(axis=1))
+    return int(ids[hits[0]]) if len(hits) else None
+
+
+def split_bounds(engine, guesses: np.ndarray, ids: np.ndarray,
+                 weights: Optional[np.ndarray] = None):
+    """
+    The distinct ways 'guesses' split the set 'ids', each with its bound,
+    as (guesses, block, lb, ss, is_cand, perfect) arrays with one entry
+    per split. Guesses with equal pattern rows over 'ids' split it the same
+    way, so only the first of each is kept (list candidates first to keep
+    a candidate), and guesses that leave everything in one bucket are
+    dropped. 'block' holds the pattern rows, 'lb' the bound mass(S) +
+    Σ floor(S_p), 'ss' the sum of squared bucket masses and 'perfect' says
+    every bucket is a single candidate. 'weights' are answer priors
+    indexed by answer id (None: every answer counts 1).
+    """
+    n = len(ids)
+    block = np.ascontiguousarray(engine.block(guesses, ids), dtype=np.uint8)
+    _, first = np.unique(block.view(np.dtype((np.void, n))).ravel(), return_index=True)
+    first.sort()
+    guesses, block = guesses[first], block[first]
+
+    hist = block_histograms(block)
+    keep = hist.max(axis=1) < n
+    guesses, block, hist = guesses[keep], block[keep], hist[keep]
+    is_cand = hist[:, ALL_GREEN] > 0
+    perfect = hist.max(axis=1) == 1
+    if weights is None:
+        buckets = np.count_nonzero(hist, axis=1) - is_cand
+        # n for this guess, then at least 2m - 1 for each unsolved bucket of size m
+        lb = n + 2 * (n - is_cand) - buckets
+        ss = (hist.astype(np.int64) ** 2).sum(axis=1)
+    else:
+        w = weights[ids]
+        mass = block_histograms(block, np.tile(w, len(guesses)))
+        # heaviest candidate per bucket, one column at a time (a row has one bucket per column)
+        heaviest = np.zeros_like(mass)
+        rows = np.arange(len(guesses))
+        for j in range(n):
+            heaviest[rows, block[:, j]] = np.maximum(heaviest[rows, block[:, j]], w[j])
+        # the set's mass for this guess, then floor(S_p) = 2|S_p| - heaviest for each unsolved bucket
+        total = float(w.sum())
+        lb = (total + 2.0 * (total - mass[:, ALL_GREEN])
+              - (heaviest.sum(axis=1) - heaviest[:, ALL_GREEN]))
+        ss = (mass ** 2).sum(axis=1)
+    return guesses, block, lb, ss, is_cand, perfect
+
+
+def bound_order(guesses: np.ndarray, lb: np.ndarray, ss: np.ndarray,
+                is_cand: np.ndarray) -> np.ndarray:
+    """split_bounds() entries best bound first (ties: smaller buckets, then candidates, then id)."""
+    return np.lexsort((guesses, ~is_cand, ss, lb))
+
+
+class BranchAndBound:
+    """
+    The cost(S) recurrence with memo and cut-offs. Subclasses provide
+    moves() and children(), and override key(), mass() and floor() when the
+    memo key or the costs differ from the defaults. 'integral' says costs
+    are whole numbers, so a cut-off bound can be rounded up.
+    """
+    integral = True
+
+    def __init__(self):
+        # key -> (exact cost, guess id)
+        self.memo: Dict[Hashable, Tuple[float, int]] = {}
+        # key -> proven lower bound (from searches that were cut off)
+        self.bounds: Dict[Hashable, float] = {}
+        self.nodes = 0
+
+    # ---- hooks -----------------------------------------------------------
+
+    def key(self, bits: int) -> Hashable:
+        return bits
+
+    def mass(self, ids: np.ndarray) -> float:
+        """What guessing once costs the set 'ids'."""
+        return len(ids)
+
+    def floor(self, ids: np.ndarray) -> float:
+        """Fewest total guesses any strategy can spend on 'ids'."""
+        return lower_bound(len(ids))
+
+    def moves(self, ids: np.ndarray) -> Tuple[Sequence[Move], bool]:
+        """
+        Guesses to try at the set 'ids', most promising first, and whether
+        the first one is known to be optimal with its bound as its cost.
+        Bounds, where given, must not decrease along the list.
+        """
+        raise NotImplementedError
+
+    def children(self, ids: np.ndarray, g: int, row: Optional[np.ndarray]) -> List[Tuple[int, float]]:
+        """(bitset, floor) of the non-solved buckets of guess 'g' over 'ids', largest first."""
+        raise NotImplementedError
+
+    # ---- search ----------------------------------------------------------
+
+    def bound(self, bits: int, floor: float) -> float:
+        if bits.bit_count() <= 2:
+            return floor
+        key = self.key(bits)
+        hit = self.memo.get(key)
+        if hit is not None:
+            return hit[0]
+        return max(self.bounds.get(key, 0), floor)
+
+    def solve(self, bits: int, beta: float = INF, floor: Optional[float] = None,
+              deadline: Optional[float] = None) -> float:
+        """
+        Fewest total guesses to solve the set 'bits' if that is below
+        'beta'; otherwise some lower bound >= beta. 'floor' is the set's
+        floor when the caller already has it. Raises OutOfTime once the
+        time.perf_counter() value 'deadline' passes.
+        """
+        return self.search(bits, beta, floor, deadline)[0]
+
+    def search(self, bits: int, beta: float = INF, floor: Optional[float] = None,
+               deadline: Optional[float] = None) -> Tuple[float, Optional[int]]:
+        """
+        solve() with the guess that achieves the cost (None for sets of two
+        or fewer and for searches that were cut off). Callers that need the
+        guess take it from here rather than from the memo, which another
+        thread may clear in the meantime.
+        """
+        n = bits.bit_count()
+        if floor is None:
+            floor = self.floor(CandidateSet(bits).ids())
+        if n <= 2:
+            return floor, None
+        key = self.key(bits)
+        hit = self.memo.get(key)
+        if hit is not None:
+            return hit
+        lb = max(self.bounds.get(key, 0), floor)
+        if lb >= beta:
+            return lb, None
+
+        self.nodes += 1
+        ids = CandidateSet(bits).ids()
+        moves, exact = self.moves(ids)
+        if exact:
+            # a perfect split meets the floor of every bucket, nothing can do better
+            g, cost, _ = moves[0]
+            self.memo[key] = (cost, g)
+            return cost, g
+
+        mass = self.mass(ids)
+        best, best_g = beta, None
+        try:
+            for g, glb, row in moves:
+                if glb is not None and glb >= best:
+                    break  # sorted by bound: nothing after this can win either
+                kids = self.children(ids, g, row)
+                if len(kids) == 1 and kids[0][0] == bits:
+                    continue  # learns nothing
+                rest = sum(self.bound(k, f) for k, f in kids)
+                if mass + rest >= best:
+                    continue
+                total = mass
+                for k, f in kids:
+                    if deadline is not None and time.perf_counter() > deadline:
+                        raise OutOfTime
+                    rest -= self.bound(k, f)
+                    total += self.solve(k, best - total - rest, f, deadline)
+                    if total + rest >= best:
+                        break
+                else:
+                    best, best_g = total, g
+        except OutOfTime as stop:
+            # every frame on the way up overwrites this, so the caller sees the top-level set's pick
+            if best_g is not None:
+                stop.guess, stop.cost = best_g, best
+            else:
+                g, glb, _ = moves[0]
+                stop.guess, stop.cost = g, INF if glb is None else glb
+            raise
+
+        if best_g is None:
+            # every guess was cut off: the true cost is at least beta
+            cut = int(np.ceil(beta)) if self.integral else beta
+            self.bounds[key] = max(self.bounds.get(key, 0), cut)
+            return self.bounds[key], None
+        self.memo[key] = (best, best_g)
+        return best, best_g
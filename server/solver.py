@@ -1,99 +1,667 @@
-from collections import Counter
 from functools import lru_cache
+import os
 import random
+import time
+
+import numpy as np
 
 # If you already have these modules, keep them; otherwise stub them or load from files.
 from wordle_secret_words import get_secret_words
-from valid_wordle_guesses import get_valid_wordle_guesses
-
-# Normalize lists to lowercase 5-letter words
-VALID = {w.strip().lower() for w in get_valid_wordle_guesses() if len(w) == 5 and w.isalpha()}
-ANSWERS = {w.strip().lower() for w in get_secret_words()         if len(w) == 5 and w.isalpha()}
-
-@lru_cache(maxsize=500_000)
-def feedback_pattern(guess: str, answer: str) -> str:
-    g = guess.lower()
-    a = answer.lower()
-    res = ['B'] * 5
-
-    # count non-green letters in answer
-    counts = [0]*26
-    ai = lambda ch: ord(ch) - 97
-
-    # mark greens & tally remaining answer letters
-    for i, ch in enumerate(g):
-        if ch == a[i]:
-            res[i] = 'G'
+from candidates import CandidateSet, mask_from_bools
+from feedback import get_engine, get_feedback_cache
+from patterns import ALL_GREEN, PATTERN_COUNT, encode_words
+from scoring import (
+    CHUNK_GUESSES, DEFAULT_BLEND, best_guess, race, candidate_mass, check_objective, entropy,
+    equivalence_classes, equivalent_guesses, iter_histograms, objective_scores, sum_squares,
+    top_guesses, worst_case,
+)
+from endgame import ENDGAME_MIN_MS, ENDGAME_OBJECTIVES, ENDGAME_SIZE, Endgame
+from priors import get_priors, priors_version
+from search import perfect_candidate
+from transposition import get_table, pool_key, position_key
+from words import (
+    ANSWERS, ANSWER_IDS, GUESS_IDS, LETTERS, N_ANSWERS, N_WORDS, VALID, WORD_ID, WORDS,
+    id_flags, to_ids,
+)
+
+# ENGINE.row(guess_id)[answer_id] is the encoded pattern (see words.py for ids);
+# the backend (matrix / numpy / python) is picked by config, see feedback.py
+ENGINE = get_engine()
+# single (guess, answer) lookups, e.g. /feedback
+FEEDBACK_CACHE = get_feedback_cache()
+# best guesses by position, shared by /solve and the benchmark
+TT = get_table()
+# answer weights (priors.py), None when every answer is equally likely
+PRIORS = get_priors()
+PRIORS_VERSION = priors_version(PRIORS)
+
+def _answer_id(w: str):
+    i = WORD_ID.get(w)
+    return i if i is not None and i < N_ANSWERS else None
+
+def _answer_ids(words):
+    """Interned ids if every word is a known answer (and there is at least one), else None."""
+    ids = to_ids(words)
+    return ids if ids is not None and len(ids) and ids[-1] < N_ANSWERS else None
+
+def feedback_pattern(guess: str, answer: str) -> int:
+    """Encoded feedback (base 3, B=0/Y=1/G=2 per position; see patterns.py)."""
+    return FEEDBACK_CACHE.pattern(guess.lower(), answer.lower())
+
+# ---- id-based API ------------------------------------------------------------
+# Candidates are uint16 arrays of answer ids, guess pools arrays of word ids.
+
+def filter_ids(cand_ids: np.ndarray, guess, pattern: int) -> np.ndarray:
+    """
+    Keep only candidate ids that would yield 'pattern' for 'guess' (a word id,
+    or a word string when the guess is not in the table).
+    """
+    if isinstance(guess, str):
+        return cand_ids[ENGINE.codes(guess, LETTERS[cand_ids]) == pattern]
+    return cand_ids[ENGINE.row(guess)[cand_ids] == pattern]
+
+def _expected_from_columns(gi: int, cols: np.ndarray, n: int) -> float:
+    """Expected remaining for guess row 'gi' over answer columns 'cols', scaled to n."""
+    m = len(cols)
+    if PRIORS is not None:
+        # bucket masses, scaled by the sample's share of n
+        w = PRIORS[cols]
+        buckets = np.bincount(ENGINE.row(gi)[cols], weights=w, minlength=PATTERN_COUNT)
+        return float(np.dot(buckets, buckets)) * n / (m * float(w.sum()))
+    buckets = np.bincount(ENGINE.row(gi)[cols], minlength=PATTERN_COUNT)
+    return float(np.dot(buckets, buckets)) * n / (m * m)
+
+def expected_remaining_ids(guess_id: int, cand_ids: np.ndarray, cap: int = 600) -> float:
+    """
+    Lower is better: expected size of the candidate set after playing
+    'guess_id' (with PRIORS, its expected mass).
+    """
+    n = len(cand_ids)
+    if n == 0:
+        return 0.0
+    sample = cand_ids if n <= cap else cand_ids[random.sample(range(n), cap)]
+    return _expected_from_columns(guess_id, sample, n)
+
+SCORING_MODES = ("racing", "exact")
+# "sampled" (fixed random slices of pool and candidates) was replaced by racing
+SCORING_ALIASES = {"sampled": "racing"}
+
+# depth=2 search (see lookahead_ids)
+LOOKAHEAD_OBJECTIVES = ("expected", "entropy")
+DEFAULT_TOP_K = 10
+# follow-ups are drawn from the best guesses of the one-step ranking
+DEFAULT_CHILD_POOL = 500
+# rankings (depth-2 first guesses, ranked_guess_ids) shortlist this many times
+# the entries they need, then keep one per distinct split
+SHORTLIST_FACTOR = 4
+
+# exact endgame searches by (pool, mode), each with its own bitset memo (see endgame.py)
+_ENDGAMES: dict = {}
+
+def _endgame(pool_ids: np.ndarray, easy_mode: bool) -> Endgame:
+    key = (pool_key(pool_ids) if easy_mode else None, easy_mode)
+    eg = _ENDGAMES.get(key)
+    if eg is None:
+        if len(_ENDGAMES) >= 8:
+            _ENDGAMES.clear()
+        eg = _ENDGAMES[key] = Endgame(ENGINE, pool_ids, easy_mode,
+                                      weights=None if PRIORS is None else PRIORS[:N_ANSWERS])
+    return eg
+
+# _HAS_LETTER[w, c]: word id w contains letter c (for priority_order)
+_HAS_LETTER = np.zeros((N_WORDS, 26), dtype=np.int64)
+_HAS_LETTER[np.arange(N_WORDS)[:, None], LETTERS] = 1
+
+# histogram of a guess that is the only candidate: one bucket of one
+_SOLVED_HIST = np.zeros((1, PATTERN_COUNT), dtype=np.int64)
+_SOLVED_HIST[0, ALL_GREEN] = 1
+
+def guess_stats(guess_id: int, cand_ids: np.ndarray) -> dict:
+    """
+    Exact expected remaining, entropy (bits) and worst case of one guess
+    over the candidates. With PRIORS the first two are read off bucket
+    masses; the worst case stays a count of candidates.
+    """
+    if len(cand_ids) == 0:
+        return {"expected": 0.0, "entropy": 0.0, "worst": 0}
+    row = ENGINE.row(guess_id)[cand_ids]
+    weights, n = candidate_mass(cand_ids, PRIORS)
+    hist = np.bincount(row, minlength=PATTERN_COUNT)[None, :]
+    mass = hist if weights is None else np.bincount(row, weights=weights, minlength=PATTERN_COUNT)[None, :]
+    return {
+        "expected": float(sum_squares(mass)[0]) / n if n else 0.0,
+        "entropy": float(entropy(mass, n)[0]),
+        "worst": int(worst_case(hist)[0]),
+    }
+
+# equivalent_guess_ids at the opening, by (guess id, easy_mode)
+_OPENING_EQUIVALENTS: dict = {}
+
+def equivalent_guess_ids(guess_id: int, cand_ids: np.ndarray, pool_ids: np.ndarray = GUESS_IDS,
+                         easy_mode: bool = True, deadline_ms: float | None = None) -> tuple[np.ndarray, bool]:
+    """
+    The other guesses that split the candidates exactly like 'guess_id'
+    (scoring.equivalent_guesses; none of them is scored) by id, and whether
+    the pass finished. The pool and 'deadline_ms' are as in choose_guess_ids.
+    """
+    deadline = None if deadline_ms is None else time.perf_counter() + deadline_ms / 1000.0
+    key = (guess_id, easy_mode)
+    opening = len(cand_ids) == N_ANSWERS and pool_ids is GUESS_IDS
+    if opening and key in _OPENING_EQUIVALENTS:
+        return _OPENING_EQUIVALENTS[key], True
+    pool = np.union1d(pool_ids, cand_ids) if easy_mode else cand_ids
+    same, complete = equivalent_guesses(ENGINE, guess_id, pool, cand_ids, deadline)
+    same = same[same != guess_id]
+    if opening and complete:
+        # every game starts here, and the scan over all answers is the slowest one
+        if len(_OPENING_EQUIVALENTS) >= 64:
+            _OPENING_EQUIVALENTS.clear()
+        _OPENING_EQUIVALENTS[key] = same
+    return same, complete
+
+def choose_guess_ids(cand_ids: np.ndarray,
+                     pool_ids: np.ndarray,
+                     easy_mode: bool = True,
+                     scoring: str = "racing",
+                     objective: str = "expected",
+                     blend: float = DEFAULT_BLEND,
+                     depth: int = 1,
+                     top_k: int = DEFAULT_TOP_K,
+                     budget_ms: float | None = None,
+                     deadline_ms: float | None = None,
+                     endgame: int = ENDGAME_SIZE) -> tuple[int, float, bool]:
+    """
+    Best guess id, its score under 'objective' (see scoring.py; lower is
+    better) and whether the search finished.
+
+    scoring="exact" scores every pool guess against every candidate and
+    returns the true argmin (deterministic; ties prefer candidates, then the
+    lowest id). scoring="racing" races the whole pool on growing random
+    samples of the candidates (scoring.race), so compute goes where the
+    decision is close; its score is an estimate unless the race reached
+    the full set. depth=2 runs lookahead_ids (always exact) over the top_k
+    first guesses within 'budget_ms'; its score is the two-move score.
+    Results are stored in the transposition table (TT) by position and
+    settings.
+
+    With 'deadline_ms' the search is anytime: exact scoring goes through
+    the pool in priority order (see priority_order) checking the clock
+    between batches, racing checks it between rounds, and the best guess so
+    far comes back with complete=False once the deadline passes.
+    Incomplete results are not stored in the TT. With PRUNE_DOMINATED an
+    easy-mode pool is first cut to informative_pool.
+
+    With 2..'endgame' candidates left (and any objective but minimax) the
+    choice goes to the exact endgame search instead (endgame.py): the
+    guess with the fewest expected turns to finish, reported with its
+    score under 'objective'. It honours 'deadline_ms' too, returning its
+    best guess so far with complete=False, and is skipped for one-ply
+    scoring when 'deadline_ms' is under ENDGAME_MIN_MS. endgame=0 turns
+    this off.
+
+    With answer priors (PRIORS) one-ply scores are read off weighted bucket
+    masses, ties between candidates go to the likelier answer, the endgame
+    weights its costs, and racing scores exactly (its estimators sample
+    candidates uniformly). depth=2 still counts candidates.
+    """
+    deadline = None if deadline_ms is None else time.perf_counter() + deadline_ms / 1000.0
+    scoring = SCORING_ALIASES.get(scoring, scoring)
+    if scoring not in SCORING_MODES:
+        raise ValueError(f"unknown scoring mode {scoring!r}")
+    if depth not in (1, 2):
+        raise ValueError(f"depth must be 1 or 2, got {depth!r}")
+    check_objective(objective, blend)
+    if len(cand_ids) == 1:
+        g = int(cand_ids[0])
+        return g, float(objective_scores(_SOLVED_HIST, 1, objective, blend)[0]), True
+    if (len(cand_ids) <= endgame and objective in ENDGAME_OBJECTIVES
+            and (deadline_ms is None or deadline_ms >= ENDGAME_MIN_MS)):
+        g, _, complete = _endgame(pool_ids, easy_mode).best(cand_ids, deadline)
+        weights, n = candidate_mass(cand_ids, PRIORS)
+        hist = np.bincount(ENGINE.row(g)[cand_ids], weights=weights, minlength=PATTERN_COUNT)[None, :]
+        return g, float(objective_scores(hist, n, objective, blend)[0]), complete
+
+    # same position, same settings: reuse the stored answer (see transposition.py)
+    settings = (easy_mode, scoring, objective, blend, depth, PRIORS_VERSION)
+    if depth == 2:
+        settings += (top_k,)
+    key = position_key(cand_ids, pool_key(pool_ids), *settings)
+    hit = TT.get(key)
+    if hit is not None:
+        return hit + (True,)
+
+    if easy_mode and PRUNE_DOMINATED:
+        pool_ids = informative_pool(pool_ids, cand_ids)
+    if depth == 2:
+        if deadline is not None:
+            left = (deadline - time.perf_counter()) * 1000.0
+            budget_ms = left if budget_ms is None else min(budget_ms, left)
+        g, s, complete = lookahead_ids(cand_ids, pool_ids, easy_mode, objective, top_k, budget_ms)
+    else:
+        g, s, complete = _choose_one_ply(cand_ids, pool_ids, easy_mode, scoring,
+                                         objective, blend, deadline)
+    if complete:
+        TT.put(key, (g, s))
+    return g, s, complete
+
+def priority_order(pool: np.ndarray, cand_ids: np.ndarray) -> np.ndarray:
+    """
+    'pool' with the most promising guesses first: by how many candidates
+    contain each of the guess's distinct letters. Costs one small matrix
+    product, so an anytime search spends its budget where winners are.
+    """
+    freq = _HAS_LETTER[cand_ids].sum(axis=0, dtype=np.int64)
+    prio = _HAS_LETTER[pool] @ freq
+    return pool[np.argsort(-prio, kind='stable')]
+
+# dominance pruning (see informative_pool). The pass costs about as much as
+# scoring the whole pool from the resident matrix, so by default it only runs
+# when rows are computed on demand; WORDLE_PRUNE_DOMINATED=1/0 forces it on/off
+PRUNE_DOMINATED = {"1": True, "0": False}.get(os.environ.get("WORDLE_PRUNE_DOMINATED", ""),
+                                             ENGINE.name != "matrix")
+_DEAD = 26
+_POS_BASE = 27 ** np.arange(5, dtype=np.int64)
+# count digits: letter * 6 + capped count (a word has at most 5 of a letter)
+_COUNT_BASE = 157 ** np.arange(5, dtype=np.int64)
+_SIG_SHIFT = 157 ** 5
+# every non-empty set of positions, as bit masks and as a (31, 5) bool array
+_POSITION_MASKS = np.arange(1, 32)
+_POSITION_SETS = ((_POSITION_MASKS[:, None] >> np.arange(5)) & 1).astype(bool)
+_same = LETTERS[:, :, None] == LETTERS[:, None, :]
+_REPEATS = _same.sum(axis=2)
+# _FIRST[w, i]: position i holds the first occurrence of its letter in WORDS[w]
+_FIRST = ~np.tril(_same, k=-1).any(axis=2)
+# _GROUP[w, i]: bit mask of the positions holding the same letter as position i
+_GROUP = (_same << np.arange(5)).sum(axis=2)
+_NO_INFO = _DEAD * int(_POS_BASE.sum()) * _SIG_SHIFT
+del _same
+
+def informative_pool(pool_ids: np.ndarray, cand_ids: np.ndarray) -> np.ndarray:
+    """
+    'pool_ids' without guesses whose split of 'cand_ids' is provably the
+    same as, or coarser than, another pool guess's. Candidates are always
+    kept (they can win outright).
+
+    The feedback on one letter of a guess is fixed by whether the answer
+    has it at each position the guess plays it, and by min(count in the
+    answer, count in the guess). Against the candidates, a position where
+    no candidate or every candidate has the letter tells nothing, and the
+    count tells nothing once it is capped at or below the fewest copies any
+    candidate has (and can be capped at the most any has). What is left is
+    the guess's signature: its informative letter/positions plus its
+    informative (letter, count) pairs. Equal signatures split the
+    candidates identically (the lowest id is kept); a signature that is
+    another's with some of that dropped splits them more coarsely.
+    """
+    letters = LETTERS[cand_ids]
+    counts = (letters[:, :, None] == np.arange(26)).sum(axis=1)
+    least, most = counts.min(axis=0), counts.max(axis=0)
+    has = np.zeros((5, 26), dtype=bool)
+    has[np.arange(5), letters] = True
+    fixed = (letters == letters[:1]).all(axis=0)
+    always = np.zeros((5, 26), dtype=bool)
+    always[np.flatnonzero(fixed), letters[0, fixed]] = True
+
+    word = LETTERS[pool_ids]
+    pos = np.arange(5)
+    live = has[pos, word] & ~always[pos, word]
+    digits = np.where(live, word, _DEAD).astype(np.int64)
+    cap = np.minimum(_REPEATS[pool_ids], most[word])
+    # one count digit per informative letter, at its first occurrence
+    count_digits = np.where(_FIRST[pool_ids] & (cap > least[word]), word * 6 + cap, 0)
+    # sorted, so the same letters and counts give the same code wherever they are played
+    sig = (digits @ _POS_BASE) * _SIG_SHIFT + np.sort(count_digits, axis=1) @ _COUNT_BASE
+
+    sigs, first = np.unique(sig, return_index=True)
+    live, digits, count_digits = live[first], digits[first], count_digits[first]
+    group = _GROUP[pool_ids[first]]
+    # every signature reachable by dropping some informative positions (and the
+    # count of a letter once all its positions are dropped) is dominated
+    dominated = np.zeros(len(sigs), dtype=bool)
+    for mask, kill in zip(_POSITION_MASKS, _POSITION_SETS):
+        gone = (group & ~mask) == 0  # every occurrence of the letter at i is dropped
+        counted = np.where(gone, 0, count_digits)
+        rows = (live & kill).any(axis=1) | (counted != count_digits).any(axis=1)
+        code = ((np.where(kill, _DEAD, digits[rows]) @ _POS_BASE) * _SIG_SHIFT
+                + np.sort(counted[rows], axis=1) @ _COUNT_BASE)
+        at = np.minimum(np.searchsorted(sigs, code), len(sigs) - 1)
+        dominated[at[sigs[at] == code]] = True
+    keep = ~dominated
+    keep &= sigs != _NO_INFO
+
+    is_kept = id_flags(pool_ids[first[keep]])
+    is_kept[cand_ids] = True
+    return pool_ids[is_kept[pool_ids]]
+
+def _choose_one_ply(cand_ids, pool_ids, easy_mode, scoring, objective, blend,
+                    deadline) -> tuple[int, float, bool]:
+    is_cand = id_flags(cand_ids)
+    pool = np.union1d(pool_ids, cand_ids) if easy_mode else cand_ids
+
+    if scoring == "racing" and PRIORS is None:
+        # samples are prefixes of one shuffle (python's random, so seeding it is enough)
+        order = cand_ids[random.sample(range(len(cand_ids)), len(cand_ids))]
+        if deadline is not None:
+            pool = priority_order(pool, cand_ids)
+        return race(ENGINE, pool, cand_ids, is_cand, objective, blend, order=order, deadline=deadline)
+
+    # strong guesses first: an anytime search spends its budget on them, and a
+    # good early incumbent lets best_guess prune the rest sooner
+    pool = priority_order(pool, cand_ids)
+    return best_guess(ENGINE, pool, cand_ids, is_cand, objective, blend, deadline, prior=PRIORS)
+
+def ranked_guess_ids(cand_ids: np.ndarray,
+                     pool_ids: np.ndarray,
+                     easy_mode: bool = True,
+                     objective: str = "expected",
+                     blend: float = DEFAULT_BLEND,
+                     top: int = 10,
+                     deadline_ms: float | None = None) -> tuple[list[dict], bool]:
+    """
+    The 'top' best guesses from one exact pass (scoring.top_guesses), best
+    first, as {"id", "score", "worst", "buckets", "candidate", "equivalents"},
+    and whether the pass finished.
+    Guesses that split the candidates the same way share one entry (the
+    one the tie-break prefers) and those within the pass's shortlist are
+    listed under "equivalents", unscored. The pass keeps SHORTLIST_FACTOR *
+    top guesses so collapsing them still leaves 'top' entries (in the rare
+    position where it does not, the pass is repeated on a longer list).
+    The winner of a complete pass also goes into the TT as the exact
+    one-ply answer, so asking choose_guess_ids next costs no second pass.
+    With 'deadline_ms' (as in choose_guess_ids) the pass goes through the
+    pool in priority order and ranks only what it reached in time.
+    """
+    check_objective(objective, blend)
+    deadline = None if deadline_ms is None else time.perf_counter() + deadline_ms / 1000.0
+    is_cand = id_flags(cand_ids)
+    pool = np.union1d(pool_ids, cand_ids) if easy_mode else cand_ids
+    if deadline is not None:
+        pool = priority_order(pool, cand_ids)
+    size = SHORTLIST_FACTOR * top
+    while True:
+        ids, scores, worst, buckets, complete = top_guesses(ENGINE, pool, cand_ids, is_cand, size,
+                                                            objective, blend, prior=PRIORS, deadline=deadline)
+        distinct, rep_of = equivalence_classes(ENGINE, ids, cand_ids, is_cand, prior=PRIORS)
+        if distinct.sum() >= top or len(ids) < size or not complete:
+            break
+        # late in a game whole shortlists can be one split (say, every perfect one)
+        size *= SHORTLIST_FACTOR
+    if PRIORS is not None:
+        # the pass ranks by masses; the worst case is reported as a count, as in guess_stats
+        worst = np.array([np.bincount(r, minlength=PATTERN_COUNT).max() for r in ENGINE.block(ids, cand_ids)])
+    ranked = []
+    for i in np.flatnonzero(distinct)[:top].tolist():
+        same = np.sort(ids[(rep_of == i) & (np.arange(len(ids)) != i)])
+        ranked.append({
+            "id": int(ids[i]),
+            "score": float(scores[i]),
+            "worst": int(worst[i]),
+            "buckets": int(buckets[i]),
+            "candidate": bool(is_cand[ids[i]]),
+            "equivalents": same.tolist(),
+        })
+    if len(cand_ids) > 1 and complete:
+        settings = (easy_mode, "exact", objective, blend, 1, PRIORS_VERSION)
+        TT.put(position_key(cand_ids, pool_key(pool_ids), *settings), (ranked[0]["id"], ranked[0]["score"]))
+    return ranked, complete
+
+def pick_best_guess_ids(cand_ids: np.ndarray,
+                        pool_ids: np.ndarray,
+                        easy_mode: bool = True,
+                        scoring: str = "racing",
+                        objective: str = "expected",
+                        blend: float = DEFAULT_BLEND,
+                        depth: int = 1,
+                        top_k: int = DEFAULT_TOP_K,
+                        budget_ms: float | None = None,
+                        deadline_ms: float | None = None,
+                        endgame: int = ENDGAME_SIZE) -> tuple[int, bool]:
+    """(best guess id, complete); see choose_guess_ids for the options."""
+    g, _, complete = choose_guess_ids(cand_ids, pool_ids, easy_mode, scoring, objective, blend,
+                                      depth=depth, top_k=top_k, budget_ms=budget_ms,
+                                      deadline_ms=deadline_ms, endgame=endgame)
+    return g, complete
+
+def start_candidate_ids() -> np.ndarray:
+    """Fresh candidate ids at the start of a game."""
+    return ANSWER_IDS.copy()
+
+# ---- bitset candidates -------------------------------------------------------
+
+# bucket_masks serves the guesses of a history (mostly the opener) and one
+# search's top_k first guesses; an entry is ~24 KB (a 290-byte mask per
+# bucket), so this caps it near 1.5 MB per worker
+BUCKET_MASK_GUESSES = 64
+
+@lru_cache(maxsize=BUCKET_MASK_GUESSES)
+def bucket_masks(guess_id: int) -> dict[int, int]:
+    """Every non-empty bucket of 'guess_id' over all answers, as {pattern: mask}."""
+    row = np.asarray(ENGINE.row(guess_id))
+    return {int(p): mask_from_bools(row == p) for p in np.unique(row)}
+
+def bucket_mask(guess, pattern: int) -> CandidateSet:
+    """
+    Answers that yield 'pattern' for 'guess' (a word id, or a word string
+    when the guess is not in the table).
+    """
+    if isinstance(guess, str):
+        return CandidateSet(mask_from_bools(ENGINE.codes(guess, LETTERS[:N_ANSWERS]) == pattern))
+    return CandidateSet(bucket_masks(guess).get(pattern, 0))
+
+def candidates_after(history) -> CandidateSet:
+    """Candidates consistent with [(guess, pattern), ...]: one AND per turn."""
+    cands = CandidateSet.full()
+    for guess, pattern in history:
+        cands &= bucket_mask(guess, pattern)
+    return cands
+
+# ---- two-ply lookahead -------------------------------------------------------
+# Rank the pool one step deep, then for the top_k guesses play the best
+# follow-up in every bucket and rank by what is left after both moves:
+#   expected  expected candidates still unsolved after two guesses
+#             (a solved game counts 0, so guessing a candidate pays off)
+#   entropy   bits gained by both guesses together (negated)
+# Children are candidate bitsets (bucket_masks(g) & parent), memoized per
+# search, so identical buckets under different first guesses score once.
+
+def _child_value(ids: np.ndarray, follow: np.ndarray, objective: str) -> float:
+    """Best one-move value over 'ids': expected unsolved (min) or entropy (max)."""
+    m = len(ids)
+    if m <= 2 or perfect_candidate(ENGINE, ids) is not None:
+        # guessing a candidate that splits perfectly is optimal for both objectives
+        return (m - 1) / m if objective == "expected" else float(np.log2(m))
+
+    pool = np.union1d(follow, ids)
+    best = np.inf if objective == "expected" else -np.inf
+    for _, hist in iter_histograms(ENGINE, pool, ids):
+        if objective == "expected":
+            best = min(best, float((sum_squares(hist) - hist[:, ALL_GREEN]).min()) / m)
+        else:
+            best = max(best, float(entropy(hist, m).max()))
+    return best
+
+def lookahead_ids(cand_ids: np.ndarray,
+                  pool_ids: np.ndarray,
+                  easy_mode: bool = True,
+                  objective: str = "expected",
+                  top_k: int = DEFAULT_TOP_K,
+                  budget_ms: float | None = None,
+                  child_pool: int = DEFAULT_CHILD_POOL) -> tuple[int, float, bool]:
+    """
+    Two-ply search: (guess id, two-move score, complete). The one-step pass
+    goes through the pool in priority order and first guesses are tried in
+    one-step order, with the clock checked after every chunk of the pass
+    and every child searched, so with 'budget_ms' the result is the best of
+    the first guesses finished, or failing that the one-step favourite (with
+    its one-step score); complete is False if the budget cut it short.
+    """
+    if objective not in LOOKAHEAD_OBJECTIVES:
+        raise ValueError(f"depth=2 supports objective {' or '.join(LOOKAHEAD_OBJECTIVES)}, not {objective!r}")
+    deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000.0
+    late = lambda: deadline is not None and time.perf_counter() > deadline
+    n = len(cand_ids)
+
+    is_cand = id_flags(cand_ids)
+    pool = np.union1d(pool_ids, cand_ids) if easy_mode else cand_ids
+    if deadline is not None:
+        pool = priority_order(pool, cand_ids)
+    # guesses the pass did not reach keep an infinite score
+    first = np.full(len(pool), np.inf)
+    for lo, hist in iter_histograms(ENGINE, pool, cand_ids):
+        first[lo:lo + len(hist)] = objective_scores(hist, n, objective)
+        if late():
+            break
+    order = np.lexsort((pool, ~is_cand[pool], first))
+    favourite = int(pool[order[0]])
+    if late():
+        return favourite, float(first[order[0]]), False
+    follow = pool[order[:child_pool]] if easy_mode else cand_ids[:0]
+
+    parent = CandidateSet.from_ids(cand_ids).bits
+    memo: dict[int, float] = {}
+    best_g, best_s, done = favourite, np.inf, 0
+    # the first top_k distinct splits: equivalent guesses would search the same children
+    shortlist = order[:SHORTLIST_FACTOR * top_k]
+    distinct, _ = equivalence_classes(ENGINE, pool[shortlist], cand_ids, is_cand)
+    top = shortlist[distinct][:top_k].tolist()
+    for i in top:
+        g = int(pool[i])
+        total = 0.0
+        for p, bits in bucket_masks(g).items():
+            child = bits & parent
+            if p == ALL_GREEN or not child:
+                continue
+            if late():
+                break
+            v = memo.get(child)
+            if v is None:
+                v = memo[child] = _child_value(CandidateSet(child).ids(), follow, objective)
+            total += child.bit_count() * v
         else:
-            counts[ai(a[i])] += 1
+            s = total / n if objective == "expected" else first[i] - total / n
+            if s < best_s or (s == best_s and is_cand[g] and not is_cand[best_g]):
+                best_g, best_s = g, s
+            done += 1
+            if not late():
+                continue
+        break
+    if not done:
+        return favourite, float(first[order[0]]), False
+    return best_g, float(best_s), done == len(top)
+
+# ---- word-based API (converts at the edges) ----------------------------------
 
-    # mark yellows using counts
-    for i, ch in enumerate(g):
-        if res[i] == 'G': 
-            continue
-        idx = ai(ch)
-        if counts[idx] > 0:
-            res[i] = 'Y'
-            counts[idx] -= 1
+def filter_candidates(cands, guess: str, pattern: int):
+    """
+    Keep only words that would yield 'pattern' when 'guess' is compared to them.
+    'cands' is a set of words, or an (N, 5) letter array from encode_words
+    (e.g. a custom dictionary), in which case the kept rows are returned.
+    """
+    if isinstance(cands, np.ndarray):
+        return cands[ENGINE.codes(guess, cands) == pattern]
 
-    return ''.join(res)
+    gi = WORD_ID.get(guess)
+    if gi is None:
+        return _filter_words(cands, guess, pattern)
 
-def filter_candidates(cands: set[str], guess: str, pattern: str) -> set[str]:
-    """Keep only words that would yield 'pattern' when 'guess' is compared to them."""
-    return {w for w in cands if feedback_pattern(guess, w) == pattern}
+    # the whole bucket comes straight out of the matrix row
+    bucket = {WORDS[i] for i in np.flatnonzero(ENGINE.row(gi) == pattern)}
+    # words outside the answer list have no column; fall back for those
+    outside = {w for w in cands if _answer_id(w) is None}
+    return (cands & bucket) | _filter_words(outside, guess, pattern)
 
-def expected_remaining(guess: str, cands: list[str], cap: int = 600) -> float:
-    """Lower is better: expected size of the candidate set after playing 'guess'."""
+def _filter_words(words: set[str], guess: str, pattern: int) -> set[str]:
+    if not words:
+        return set()
+    w_list = list(words)
+    codes = ENGINE.codes(guess, encode_words(w_list))
+    return {w for w, c in zip(w_list, codes) if c == pattern}
+
+def expected_remaining(guess: str, cands, cap: int = 600) -> float:
+    """
+    Lower is better: expected size of the candidate set after playing 'guess'.
+    'cands' is a list of words or an (N, 5) letter array from encode_words.
+    """
     n = len(cands)
     if n == 0:
         return 0.0
 
+    gi = WORD_ID.get(guess)
+    if not isinstance(cands, np.ndarray):
+        cand_ids = _answer_ids(cands)
+        if gi is not None and cand_ids is not None:
+            return expected_remaining_ids(gi, cand_ids, cap=cap)
+        cands = encode_words(cands)
+
     # 1) SAMPLE candidates to bound work
-    sample = cands if n <= cap else random.sample(cands, cap)
+    sample = cands if n <= cap else cands[random.sample(range(n), cap)]
     m = len(sample)
 
-    # 2) Build buckets on the sample (fast)
-    buckets = Counter(feedback_pattern(guess, w) for w in sample)
+    # 2) Build buckets on the sample (fixed-size histogram over pattern codes)
+    buckets = np.bincount(ENGINE.codes(guess, sample), minlength=PATTERN_COUNT)
 
     # 3) SCALE the expectation back to the full set size
     #    If a pattern is a fraction p = cnt/m of the sample,
     #    we estimate it would be p*n in the full set.
     #    Expected remaining ≈ Σ p * (p*n) over buckets.
-    return sum((cnt / m) * (cnt * (n / m)) for cnt in buckets.values())
+    return float(np.dot(buckets, buckets)) * n / (m * m)
 
 def pick_best_guess(cands: set[str],
                     valid_guesses: set[str],
                     easy_mode: bool = True,
-                    sample_limit: int = 300) -> str:
+                    scoring: str = "racing",
+                    objective: str = "expected",
+                    blend: float = DEFAULT_BLEND,
+                    depth: int = 1,
+                    top_k: int = DEFAULT_TOP_K,
+                    budget_ms: float | None = None,
+                    endgame: int = ENDGAME_SIZE,
+                    deadline_ms: float | None = None) -> tuple[str, bool]:
+    """
+    (best guess, complete): choose_guess_ids over interned ids, or for
+    words outside the built-in lists an exact scan through the vectorized
+    kernel. With 'deadline_ms' either one goes through the guesses in
+    priority order, checks the clock between batches and returns the best
+    so far with complete=False once the deadline passes.
+    """
     if len(cands) == 1:
-        return next(iter(cands))
-
-    # cap the guess pool; scale with problem size
-    if easy_mode:
-        pool = set(valid_guesses)
-        limit = min(sample_limit, max(100, len(cands) // 2))
-        if len(pool) > limit:
-            pool = set(random.sample(list(pool), limit))
-        pool |= cands
-    else:
-        pool = set(cands)
+        return next(iter(cands)), True
 
-    c_list = list(cands)
+    cand_ids = _answer_ids(cands)
+    pool_ids = GUESS_IDS if valid_guesses is VALID else to_ids(valid_guesses)
+    if cand_ids is not None and pool_ids is not None:
+        g, complete = pick_best_guess_ids(cand_ids, pool_ids, easy_mode, scoring, objective, blend,
+                                          depth=depth, top_k=top_k, budget_ms=budget_ms,
+                                          deadline_ms=deadline_ms, endgame=endgame)
+        return WORDS[g], complete
+    if depth != 1:
+        raise ValueError("depth=2 needs words from the built-in lists")
 
-    # pre-sample candidates ONCE; reuse for all guesses (stable & fast)
-    cand_cap = 600 if len(c_list) > 600 else len(c_list)
-    c_eval = c_list if len(c_list) <= cand_cap else random.sample(c_list, cand_cap)
+    # custom words: exact scoring through the vectorized kernel
+    check_objective(objective, blend)
+    deadline = None if deadline_ms is None else time.perf_counter() + deadline_ms / 1000.0
+    pool = list((set(valid_guesses) | cands) if easy_mode else set(cands))
+    c_eval = encode_words(list(cands))
+    if deadline is not None:
+        # priority_order over letters: guesses whose letters most candidates share first
+        has = np.zeros((len(pool), 26), dtype=np.int64)
+        has[np.arange(len(pool))[:, None], encode_words(pool)] = 1
+        freq = (c_eval[:, :, None] == np.arange(26)).any(axis=1).sum(axis=0)
+        pool = [pool[i] for i in np.argsort(-(has @ freq), kind='stable')]
 
     best_g, best_s = None, float('inf')
-    for g in pool:
-        s = expected_remaining(g, c_eval, cap=cand_cap)  # score on subset
+    for k, g in enumerate(pool, 1):
+        hist = np.bincount(ENGINE.codes(g, c_eval), minlength=PATTERN_COUNT)[None, :]
+        s = objective_scores(hist, len(c_eval), objective, blend)[0]
         if s < best_s or (s == best_s and g in cands):
             best_g, best_s = g, s
-    return best_g or next(iter(cands))
+        if deadline is not None and k % CHUNK_GUESSES == 0 and k < len(pool) and time.perf_counter() > deadline:
+            return best_g, False
+    return best_g or next(iter(cands)), True
 
 def start_candidates() -> set[str]:
     """Fresh candidate set at the start of a game."""
     return set(ANSWERS)
 
 def is_valid_guess(w: str) -> bool:
-    return w.lower() in VALID
\ No newline at end of file
+    return w.lower() in VALID
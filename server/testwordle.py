@@ -1,12 +1,20 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-from collections import Counter
-from functools import lru_cache
 from typing import Iterable, List, Set, Tuple, Optional
 import argparse
 import random
 import os
 
+import numpy as np
+
+from endgame import ENDGAME_SIZE
+from feedback import get_feedback_cache
+from hardmode import legal_pool
+from patterns import ALL_GREEN, MATRIX_PATH, build_matrix_file, check_matrix, decode_pattern
+from scoring import DEFAULT_BLEND, OBJECTIVES, check_objective
+from transposition import POLICIES, get_table
+from words import N_ANSWERS, WORDS, to_ids
+
 # Optional colors for pretty printing in "play" mode
 try:
     from colorama import Fore, Back, Style, init as colorama_init
@@ -37,141 +45,99 @@ def load_word_sets() -> Tuple[Set[str], Set[str]]:
 
 
 # =============================================================================
-# Feedback (optimized + cached)
+# Feedback (shared engine + cached)
 # =============================================================================
 
-@lru_cache(maxsize=1_000_000)
-def feedback_pattern(guess: str, answer: str) -> str:
+def feedback_pattern(guess: str, answer: str) -> int:
     """
-    Compute Wordle feedback (G/Y/B) between guess and answer.
-    Optimized: two-pass counting with O(1) per letter operations + LRU cache.
+    Compute Wordle feedback between guess and answer as a base-3 pattern code
+    (B=0, Y=1, G=2 per position; see patterns.py) via the configured feedback
+    engine (WORDLE_FEEDBACK_BACKEND, see feedback.py) through the bounded
+    pair cache (WORDLE_FEEDBACK_CACHE_BYTES).
     """
     g = guess.lower()
     a = answer.lower()
     if len(g) != 5 or len(a) != 5:
         raise ValueError("Guess and answer must be length 5")
-
-    res = ['B'] * 5
-
-    # Count remaining letters of 'answer' that weren't green
-    counts = [0] * 26
-    ai = lambda ch: ord(ch) - 97  # 'a' -> 0 ... 'z' -> 25
-
-    # Pass 1: mark greens, tally non-green letters from answer
-    for i, ch in enumerate(g):
-        if ch == a[i]:
-            res[i] = 'G'
-        else:
-            counts[ai(a[i])] += 1
-
-    # Pass 2: mark yellows where counts allow
-    for i, ch in enumerate(g):
-        if res[i] == 'G':
-            continue
-        idx = ai(ch)
-        if 0 <= idx < 26 and counts[idx] > 0:
-            res[i] = 'Y'
-            counts[idx] -= 1
-
-    return ''.join(res)
+    return get_feedback_cache().pattern(g, a)
 
 
 # =============================================================================
 # Candidate maintenance
 # =============================================================================
 
-def filter_candidates(cands: Set[str], guess: str, pattern: str) -> Set[str]:
+def filter_candidates(cands: Set[str], guess: str, pattern: int) -> Set[str]:
     """Keep only words that would produce 'pattern' for 'guess'."""
     return {w for w in cands if feedback_pattern(guess, w) == pattern}
 
 
 # =============================================================================
-# Scoring (sampled expected remaining)
+# Scoring (expected remaining / entropy / blend / minimax; see scoring.py)
 # =============================================================================
 
-def expected_remaining(guess: str,
-                       cands: Iterable[str],
-                       cand_cap: Optional[int] = 600) -> float:
-    """
-    Estimate expected remaining candidates after playing 'guess'.
-    If cand_cap is None or 0, compute EXACT over all candidates.
-    Otherwise, sample up to 'cand_cap' candidates and scale.
-
-    Returns: approx n * sum_buckets (p_b^2), where p_b are pattern proportions.
-    Lower is better.
-    """
-    c_list = list(cands)
-    n = len(c_list)
-    if n == 0:
-        return 0.0
-
-    if not cand_cap or n <= cand_cap:
-        # Exact buckets
-        buckets = Counter(feedback_pattern(guess, w) for w in c_list)
-        return sum((cnt / n) * cnt for cnt in buckets.values())
-
-    # Sample for speed, then scale back to n via proportions
-    sample = random.sample(c_list, cand_cap)
-    m = len(sample)
-    buckets = Counter(feedback_pattern(guess, w) for w in sample)
-    # E ≈ n * Σ ( (cnt/m)^2 )
-    return n * sum((cnt / m) * (cnt / m) for cnt in buckets.values())
-
-
 def pick_best_guess(cands: Set[str],
                     valid_guesses: Set[str],
                     easy_mode: bool = True,
-                    guess_pool_limit: int = 300,
-                    cand_cap: Optional[int] = 600) -> Tuple[str, float]:
+                    scoring: str = "racing",
+                    objective: str = "expected",
+                    blend: float = DEFAULT_BLEND,
+                    depth: int = 1,
+                    top_k: int = 10,
+                    budget_ms: Optional[float] = None,
+                    endgame: int = ENDGAME_SIZE,
+                    top: int = 0,
+                    history: Optional[List[Tuple[str, int]]] = None):
     """
-    Choose the next guess quickly:
-      - Limit the GUESS POOL size (adaptive, always includes cands)
-      - Score guesses against a SHARED subset of candidates (cand_cap)
-      - Tie-break toward guesses that are in the candidate set
-    Returns: (best_guess, score_estimate)
+    Choose the next guess with the solver's batched search over interned ids
+    (solver.choose_guess_ids); words must come from the built-in lists.
+      - scoring="racing": race every guess on growing candidate samples,
+        dropping guesses that are clearly worse (see scoring.race)
+      - scoring="exact": score every guess against every candidate
+      - depth=2: two-ply lookahead over the top_k first guesses
+      - endgame: at or below this many candidates, exact search for the
+        fewest expected turns (see endgame.py; 0 turns it off)
+      - easy_mode=False with the 'history' so far: NYT hard mode, searching
+        every valid guess that reuses the revealed hints (hardmode.py);
+        without a history it keeps to the candidates
+    Ties go to guesses in the candidate set, and results go through the
+    shared transposition table. 'objective' is one of scoring.OBJECTIVES.
+    Returns: (best_guess, score_estimate), or with top=N
+    (best_guess, score_estimate, ranking): the N best guesses from one exact
+    pass as (word, score, worst bucket, bucket count, is candidate), which
+    also leaves that pass's winner for the search (solver.ranked_guess_ids).
     """
+    # not at the top: importing solver loads (and by default rebuilds) the
+    # pattern matrix, which 'cache' has to check before anything builds it
+    from solver import choose_guess_ids, ranked_guess_ids
+
+    check_objective(objective, blend)
     if len(cands) == 1:
         only = next(iter(cands))
-        return only, 0.0
-
-    # Build guess pool
-    if easy_mode:
-        pool = set(valid_guesses)
-        # Adaptive pool limit scales with search size; never below 100.
-        adaptive_limit = min(guess_pool_limit, max(100, len(cands) // 2))
-        if len(pool) > adaptive_limit:
-            pool = set(random.sample(list(pool), adaptive_limit))
-        pool |= cands  # always include candidates
-    else:
-        pool = set(cands)
-
-    c_list = list(cands)
-
-    # Pre-sample candidates ONCE for stable, fair comparisons
-    if not cand_cap or len(c_list) <= cand_cap:
-        c_eval = c_list  # exact mode or already small
-        eff_cap = None if not cand_cap else cand_cap
-    else:
-        c_eval = random.sample(c_list, cand_cap)
-        eff_cap = cand_cap
-
-    best_g, best_s = None, float('inf')
-    for g in pool:
-        s = expected_remaining(g, c_eval, cand_cap=eff_cap)
-        if s < best_s or (s == best_s and g in cands):
-            best_g, best_s = g, s
-
-    if best_g is None:
-        best_g = next(iter(cands))
-        best_s = expected_remaining(best_g, c_eval, cand_cap=eff_cap)
-    return best_g, best_s
+        return (only, 0.0, [(only, 0.0, 1, 1, True)]) if top else (only, 0.0)
+
+    cand_ids = to_ids(cands)
+    pool_ids = to_ids(valid_guesses)
+    if cand_ids is None or pool_ids is None or cand_ids[-1] >= N_ANSWERS:
+        raise ValueError("pick_best_guess needs words from the built-in lists")
+    if not easy_mode and history is not None:
+        pool_ids = np.intersect1d(pool_ids, legal_pool(history))
+        easy_mode = True
+    ranked = ranked_guess_ids(cand_ids, pool_ids, easy_mode, objective, blend, top)[0] if top else None
+    g, s, _ = choose_guess_ids(cand_ids, pool_ids, easy_mode, scoring=scoring, objective=objective,
+                               blend=blend, depth=depth, top_k=top_k, budget_ms=budget_ms,
+                               endgame=endgame)
+    if ranked is None:
+        return WORDS[g], s
+    return WORDS[g], s, [(WORDS[r["id"]], r["score"], r["worst"], r["buckets"], r["candidate"])
+                         for r in ranked]
 
 
 # =============================================================================
 # Pretty printing
 # =============================================================================
 
-def colorize(guess: str, pattern: str) -> str:
+def colorize(guess: str, pattern: int) -> str:
+    pattern = decode_pattern(pattern)
     if not _HAS_COLOR:
         out = []
         for ch, p in zip(guess.upper(), pattern):
@@ -204,39 +170,62 @@ def solve_one(answer: str,
               opener: Optional[str] = "raise",
               easy_mode: bool = True,
               max_turns: int = 6,
-              guess_pool_limit: int = 300,
-              cand_cap: Optional[int] = 600,
-              verbose: bool = True) -> Tuple[bool, int, List[Tuple[str, str]]]:
+              scoring: str = "racing",
+              objective: str = "expected",
+              blend: float = DEFAULT_BLEND,
+              depth: int = 1,
+              top_k: int = 10,
+              budget_ms: Optional[float] = None,
+              endgame: int = ENDGAME_SIZE,
+              tree: Optional[dict] = None,
+              top: int = 0,
+              verbose: bool = True) -> Tuple[bool, int, List[Tuple[str, int]]]:
     """
     Solve a single game for a given 'answer'. Returns (won, turns_used, history).
-    history is a list of (guess, pattern).
+    history is a list of (guess, pattern code).
     - opener: fixed first guess (fast path). Set to ""/None to compute first move.
-    - cand_cap: None/0 means exact scoring; otherwise sampled with this cap.
+    - easy_mode=False: NYT hard mode, every guess reuses the revealed hints.
+    - scoring: "racing" (adaptive candidate samples) or "exact".
+    - objective/blend: what pick_best_guess minimizes (see scoring.py).
+    - depth/top_k/budget_ms: depth=2 two-ply search (see pick_best_guess).
+    - endgame: candidate count at which play switches to exact endgame search.
+    - tree: decision tree from build_tree.py; its guesses are played (replacing
+      the opener) as long as the game stays on it, so play is reproducible.
+    - top: with verbose, also print the N best guesses of each searched turn.
     """
     ans = answer.lower()
     if ans not in answers and verbose:
         print(f"[warn] '{answer}' not in official answer set; still attempting.")
 
     cands = set(answers)
-    history: List[Tuple[str, str]] = []
+    history: List[Tuple[str, int]] = []
+    if tree is not None:
+        from tree import next_guess
 
     for turn in range(max_turns):
-        if turn == 0 and opener:
+        followed = next_guess(tree, history) if tree else None
+        ranking = []
+        if followed is not None:
+            guess = followed
+        elif turn == 0 and opener:
             guess = opener
         elif len(cands) == 1:
             guess = next(iter(cands))
         else:
-            # Hybrid: once the set is small, switch to exact automatically
-            dynamic_cap = (None if (cand_cap is None or cand_cap == 0 or len(cands) <= 600)
-                           else cand_cap)
-            # If small, also allow a bigger guess pool
-            dynamic_pool = guess_pool_limit if len(cands) > 600 else max(guess_pool_limit, 500)
-            guess, _ = pick_best_guess(
+            # racing grows its own sample, so small sets are scored exactly anyway
+            guess, _, *ranking = pick_best_guess(
                 cands,
                 valid_guesses,
                 easy_mode=easy_mode,
-                guess_pool_limit=dynamic_pool,
-                cand_cap=dynamic_cap
+                scoring=scoring,
+                objective=objective,
+                blend=blend,
+                depth=depth,
+                top_k=top_k,
+                budget_ms=budget_ms,
+                endgame=endgame,
+                top=top if verbose else 0,
+                history=history
             )
 
         pat = feedback_pattern(guess, ans)
@@ -244,8 +233,11 @@ def solve_one(answer: str,
 
         if verbose:
             print(f"Turn {turn+1}: {colorize(guess, pat)}   ({len(cands)} candidates before)")
+            for word, score, worst, buckets, is_cand in (ranking[0] if ranking else []):
+                print(f"    {word}  {score:.3f}  worst {worst}  {buckets} buckets"
+                      f"{'  (candidate)' if is_cand else ''}")
 
-        if pat == "GGGGG":
+        if pat == ALL_GREEN:
             return True, turn + 1, history
 
         cands = filter_candidates(cands, guess, pat)
@@ -260,14 +252,20 @@ def eval_all(valid_guesses: Set[str],
              opener: Optional[str] = "raise",
              easy_mode: bool = True,
              max_turns: int = 6,
-             guess_pool_limit: int = 300,
-             cand_cap: Optional[int] = 600,
+             scoring: str = "racing",
+             objective: str = "expected",
+             blend: float = DEFAULT_BLEND,
+             depth: int = 1,
+             top_k: int = 10,
+             budget_ms: Optional[float] = None,
+             endgame: int = ENDGAME_SIZE,
+             tree: Optional[dict] = None,
              limit: int | None = None) -> Tuple[int, int, float]:
     """
     Evaluate performance over many answers (optionally a random 'limit').
     Returns (wins, losses, average_guesses_over_played).
     """
-    pool = list(answers)
+    pool = sorted(answers)  # set order varies per process; sort so --seed reproduces
     random.shuffle(pool)
     if limit is not None:
         pool = pool[:limit]
@@ -282,8 +280,14 @@ def eval_all(valid_guesses: Set[str],
             opener=opener,
             easy_mode=easy_mode,
             max_turns=max_turns,
-            guess_pool_limit=guess_pool_limit,
-            cand_cap=cand_cap,
+            scoring=scoring,
+            objective=objective,
+            blend=blend,
+            depth=depth,
+            top_k=top_k,
+            budget_ms=budget_ms,
+            endgame=endgame,
+            tree=tree,
             verbose=False
         )
         wins += int(won)
@@ -300,20 +304,46 @@ def eval_all(valid_guesses: Set[str],
 # CLI
 # =============================================================================
 
+def check_artifacts(rebuild: bool = False) -> None:
+    """Verify the pattern matrix was built from the current word lists; exit 1 if stale."""
+    answers = WORDS[:N_ANSWERS]
+    reason = check_matrix(MATRIX_PATH, WORDS, answers)
+    if reason is None:
+        print(f"{MATRIX_PATH}: up to date")
+        return
+    if not rebuild:
+        print(f"{MATRIX_PATH}: {reason} (rerun with --rebuild)")
+        raise SystemExit(1)
+    print(f"{MATRIX_PATH}: {reason}; rebuilding…")
+    build_matrix_file(MATRIX_PATH, WORDS, answers)
+    print(f"{MATRIX_PATH}: rebuilt")
+
+
 def main():
-    parser = argparse.ArgumentParser(description="Wordle solver (fast, sampled scoring).")
+    parser = argparse.ArgumentParser(description="Wordle solver (fast, racing scoring).")
     sub = parser.add_subparsers(dest="cmd", required=True)
 
     play = sub.add_parser("play", help="Solve a single answer word.")
     play.add_argument("answer", type=str, help="The secret/answer word to solve.")
     play.add_argument("--opener", default=os.environ.get("DEFAULT_FIRST_GUESS", "raise"),
                       help="Fixed first guess (default: %(default)s). Use '' to compute first move.")
-    play.add_argument("--hard", action="store_true", help="Hard mode (restrict guesses to candidates).")
+    play.add_argument("--hard", action="store_true", help="NYT hard mode (every guess reuses the revealed hints).")
     play.add_argument("--turns", type=int, default=6)
-    play.add_argument("--guess-pool", type=int, default=300,
-                      help="Max number of guesses to score (adaptive, min 100).")
-    play.add_argument("--cand-cap", type=int, default=600,
-                      help="Max candidates to score against (None/0 = exact).")
+    play.add_argument("--scoring", choices=("racing", "exact"), default="racing",
+                      help="racing: adaptive candidate samples; exact: every candidate.")
+    play.add_argument("--objective", choices=OBJECTIVES, default="expected",
+                      help="What to minimize when picking guesses (default: %(default)s).")
+    play.add_argument("--blend", type=float, default=DEFAULT_BLEND,
+                      help="Weight on expected remaining for --objective blend.")
+    play.add_argument("--depth", type=int, choices=(1, 2), default=1,
+                      help="2 = two-ply lookahead (objective expected or entropy).")
+    play.add_argument("--top-k", type=int, default=10, help="First guesses searched at --depth 2.")
+    play.add_argument("--budget-ms", type=float, default=None, help="Time budget per --depth 2 search.")
+    play.add_argument("--endgame", type=int, default=ENDGAME_SIZE,
+                      help="Exact endgame search at or below this many candidates (0 = off).")
+    play.add_argument("--tree", default=None,
+                      help="Follow the decision tree at this path (see build_tree.py).")
+    play.add_argument("--top", type=int, default=0, help="Print the N best guesses of each searched turn.")
     play.add_argument("--seed", type=int, default=None, help="Random seed for reproducible sampling.")
     play.add_argument("--quiet", action="store_true")
 
@@ -322,15 +352,39 @@ def main():
     bench.add_argument("--opener", default=os.environ.get("DEFAULT_FIRST_GUESS", "raise"))
     bench.add_argument("--hard", action="store_true")
     bench.add_argument("--turns", type=int, default=6)
-    bench.add_argument("--guess-pool", type=int, default=300)
-    bench.add_argument("--cand-cap", type=int, default=600)
+    bench.add_argument("--scoring", choices=("racing", "exact"), default="racing")
+    bench.add_argument("--objective", choices=OBJECTIVES, default="expected")
+    bench.add_argument("--blend", type=float, default=DEFAULT_BLEND)
+    bench.add_argument("--depth", type=int, choices=(1, 2), default=1)
+    bench.add_argument("--top-k", type=int, default=10)
+    bench.add_argument("--budget-ms", type=float, default=None)
+    bench.add_argument("--endgame", type=int, default=ENDGAME_SIZE)
+    bench.add_argument("--tree", default=None)
+    bench.add_argument("--tt-entries", type=int, default=None,
+                       help="Transposition table size (default: WORDLE_TT_ENTRIES; 0 disables).")
+    bench.add_argument("--tt-policy", choices=POLICIES, default=None,
+                       help="Transposition table eviction policy (default: WORDLE_TT_POLICY).")
     bench.add_argument("--seed", type=int, default=None)
 
+    cache = sub.add_parser("cache", help="Check precomputed artifacts against the word lists.")
+    cache.add_argument("--rebuild", action="store_true",
+                       help="Rebuild stale artifacts instead of failing.")
+
     args = parser.parse_args()
+    if args.cmd == "cache":
+        check_artifacts(rebuild=args.rebuild)
+        return
     if args.seed is not None:
         random.seed(args.seed)
 
     valid, answers = load_word_sets()
+    tree = None
+    if args.tree:
+        from tree import load_tree
+        tree = load_tree(args.tree)
+        if tree is None:
+            print(f"{args.tree}: missing or built from different word lists (run build_tree.py)")
+            raise SystemExit(1)
 
     if args.cmd == "play":
         opener_arg = args.opener if args.opener != "" else None
@@ -339,27 +393,47 @@ def main():
             opener=opener_arg,
             easy_mode=not args.hard,
             max_turns=args.turns,
-            guess_pool_limit=args.guess_pool,
-            cand_cap=(None if args.cand_cap in (None, 0) else args.cand_cap),
+            scoring=args.scoring,
+            objective=args.objective,
+            blend=args.blend,
+            depth=args.depth,
+            top_k=args.top_k,
+            budget_ms=args.budget_ms,
+            endgame=args.endgame,
+            tree=tree,
+            top=args.top,
             verbose=not args.quiet
         )
         if not args.quiet:
             print("\nResult:", "WIN" if won else "LOSS", f"in {turns} turn(s)")
             for g, p in history:
-                print(f"  {g}  {p}")
+                print(f"  {g}  {decode_pattern(p)}")
 
     elif args.cmd == "bench":
+        table = get_table()
+        if args.tt_entries is not None or args.tt_policy is not None:
+            table.configure(table.max_entries if args.tt_entries is None else args.tt_entries,
+                            args.tt_policy or table.policy)
         wins, losses, avg = eval_all(
             valid, answers,
             opener=(args.opener if args.opener != "" else None),
             easy_mode=not args.hard,
             max_turns=args.turns,
-            guess_pool_limit=args.guess_pool,
-            cand_cap=(None if args.cand_cap in (None, 0) else args.cand_cap),
+            scoring=args.scoring,
+            objective=args.objective,
+            blend=args.blend,
+            depth=args.depth,
+            top_k=args.top_k,
+            budget_ms=args.budget_ms,
+            endgame=args.endgame,
+            tree=tree,
             limit=args.limit
         )
         total = wins + losses
         print(f"Played: {total} | Wins: {wins} | Losses: {losses} | Avg guesses: {avg:.3f}")
+        st = table.stats()
+        print(f"Transposition table: {st['hits']} hits / {st['misses']} misses "
+              f"({st['hit_rate']:.1%}), {st['entries']} entries, {st['evictions']} evictions")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+"""
+Transposition table: best-guess results keyed by the position they were computed for.
+
+Many histories reach the same candidate set (after a fixed opener there are
+only a few hundred second-turn states), so the solver looks a position up
+before scoring. A key is
+
+  (candidate-set fingerprint, pool, mode, objective/search settings, DICT_VERSION)
+
+built by position_key; the dictionary version keeps entries from a previous
+word list from ever matching. Size is a number of entries
+(WORDLE_TT_ENTRIES, 0 disables the table) and the eviction policy is
+WORDLE_TT_POLICY:
+
+  lru   evict the least recently used entry (hits refresh an entry)
+  fifo  evict the oldest insert (hits are read-only, so lookups are cheaper)
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import os
+import threading
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+from candidates import CandidateSet
+from words import DICT_VERSION, GUESS_IDS
+
+POLICIES = ("lru", "fifo")
+DEFAULT_TT_ENTRIES = 65536
+DEFAULT_TT_POLICY = "lru"
+
+
+def pool_key(pool_ids: np.ndarray) -> Hashable:
+    """'all' for the full guess list, else a digest of the pool ids."""
+    if pool_ids is GUESS_IDS or (len(pool_ids) == len(GUESS_IDS) and np.array_equal(pool_ids, GUESS_IDS)):
+        return "all"
+    ids = np.ascontiguousarray(pool_ids, dtype=GUESS_IDS.dtype)
+    return hashlib.blake2b(ids.tobytes(), digest_size=16).digest()
+
+
+def position_key(cand_ids: np.ndarray, pool: Hashable, *settings: Hashable) -> tuple:
+    """Key for a search over 'cand_ids' (answer ids) from 'pool' with 'settings'."""
+    return (CandidateSet.from_ids(cand_ids).fingerprint(), pool, settings, DICT_VERSION)
+
+
+class TranspositionTable:
+    """Bounded key -> result map with 'lru' or 'fifo' eviction. Thread-safe."""
+
+    def __init__(self, max_entries: int = DEFAULT_TT_ENTRIES, policy: str = DEFAULT_TT_POLICY):
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.configure(max_entries, policy)
+
+    def configure(self, max_entries: int, policy: str) -> None:
+        """Change size and policy in place, evicting down to the new size."""
+        if policy not in POLICIES:
+            raise ValueError(f"unknown eviction policy {policy!r} (choose from {', '.join(POLICIES)})")
+        with self._lock:
+            self.max_entries = max_entries
+            self.policy = policy
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > max(0, self.max_entries):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            if self.policy == "lru":
+                self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            if self.policy == "lru":
+                self._entries.move_to_end(key)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "policy": self.policy,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_table() -> TranspositionTable:
+    """Process-wide table sized by WORDLE_TT_ENTRIES, evicting by WORDLE_TT_POLICY."""
+    return TranspositionTable(int(os.environ.get("WORDLE_TT_ENTRIES", DEFAULT_TT_ENTRIES)),
+                              os.environ.get("WORDLE_TT_POLICY", DEFAULT_TT_POLICY).lower())
@@ -0,0 +1,270 @@
+"""
+Decision trees: a fixed guess for every candidate set reachable from an opener.
+
+TreeSolver looks for the tree with the fewest total guesses over the
+answers (equivalently the lowest average) by the depth-first
+branch-and-bound of search.py:
+
+  cost(S) = |S| + Σ cost(S_p) over the non-solved buckets p of the guess
+
+Results are memoized on candidate-set fingerprints (CandidateSet.fingerprint),
+which are stable across processes: the memo is checkpointed to disk, so a
+build can be stopped and resumed, and the opener's buckets are independent
+subproblems that build_tree fans out across processes.
+
+A candidate that splits its set perfectly meets the bound and ends the
+search at once. Otherwise a node tries one guess per distinct split of its
+set (search.split_bounds) in order of the bound |S| + Σ floor(S_p), and
+stops at the first bound that cannot beat the best tree found. That search
+is exact; the default (breadth=0) builds the optimal tree after raise in
+about 90 s on one core. breadth=N keeps only the N splits with the least
+expected remaining per node: faster, but its tree is only an upper bound
+on the optimum, which build_tree labels "exact": false.
+
+The finished tree is JSON: {"guess": w, "next": {pattern: node}}, with no
+"next" once the guess is the only candidate (see next_guess).
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+import json
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from candidates import CandidateSet
+from patterns import ALL_GREEN, decode_pattern, encode_pattern
+from search import BranchAndBound, bound_order, lower_bound, perfect_candidate, split_bounds
+from solver import ENGINE
+from words import ANSWER_IDS, DICT_VERSION, GUESS_IDS, N_ANSWERS, WORD_ID, WORDS
+
+FORMAT_VERSION = 1
+TREE_PATH = os.environ.get(
+    "WORDLE_DECISION_TREE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "decision_tree.json"),
+)
+DEFAULT_BREADTH = 0
+
+def _fp(bits: int) -> bytes:
+    return CandidateSet(bits).fingerprint()
+
+
+class TreeSolver(BranchAndBound):
+    """
+    Branch-and-bound over candidate sets with a fingerprint-keyed memo,
+    trying every distinct split per node (breadth=0, exact) or the
+    'breadth' best by expected remaining.
+    """
+
+    def __init__(self, breadth: int = DEFAULT_BREADTH):
+        super().__init__()
+        self.breadth = breadth
+
+    def key(self, bits: int) -> bytes:
+        return _fp(bits)
+
+    # ---- moves -----------------------------------------------------------
+
+    def moves(self, ids: np.ndarray):
+        """
+        A candidate that splits perfectly, or one guess per distinct split
+        of 'ids' with its bound and pattern row, best bound first; with
+        'breadth', only the 'breadth' splits with the least expected
+        remaining are kept.
+        """
+        g = perfect_candidate(ENGINE, ids)
+        if g is not None:
+            return [(g, lower_bound(len(ids)), None)], True
+        others = np.setdiff1d(GUESS_IDS, ids, assume_unique=True)
+        guesses, block, lb, ss, is_cand, _ = split_bounds(ENGINE, np.concatenate([ids, others]), ids)
+        if self.breadth:
+            # expected remaining is ss / |S|, so the beam is the lowest ss
+            top = np.lexsort((guesses, ~is_cand, ss))[:self.breadth]
+            guesses, block, lb, ss, is_cand = guesses[top], block[top], lb[top], ss[top], is_cand[top]
+        order = bound_order(guesses, lb, ss, is_cand)
+        return list(zip(guesses[order].tolist(), lb[order].tolist(), block[order])), False
+
+    def children(self, ids: np.ndarray, g: int, row: Optional[np.ndarray] = None):
+        if row is None:
+            row = ENGINE.row(g)[ids]
+        order = np.argsort(row, kind='stable')
+        codes, starts = np.unique(row[order], return_index=True)
+        parts = np.split(order, starts[1:])
+        kids = [ids[p] for c, p in zip(codes.tolist(), parts) if c != ALL_GREEN]
+        kids.sort(key=len, reverse=True)
+        return [(CandidateSet.from_ids(k).bits, lower_bound(len(k))) for k in kids]
+
+    # ---- tree ------------------------------------------------------------
+
+    def tree(self, bits: int, guess: Optional[int] = None) -> dict:
+        """Nested {"guess", "next"} dict for a solved set; 'guess' overrides the root."""
+        ids = CandidateSet(bits).ids()
+        if guess is None:
+            if len(ids) <= 2:
+                guess = int(ids[0])
+            else:
+                guess = self.search(bits)[1]
+        node: dict = {"guess": WORDS[guess]}
+        if len(ids) == 1 and ids[0] == guess:
+            return node
+        row = ENGINE.row(guess)
+        nxt = {}
+        for p in np.unique(row[ids]).tolist():
+            if p != ALL_GREEN:
+                nxt[decode_pattern(p)] = self.tree(CandidateSet.from_ids(ids[row[ids] == p]).bits)
+        node["next"] = nxt
+        return node
+
+    # ---- checkpoints -----------------------------------------------------
+
+    def load(self, path: str) -> None:
+        """Merge a checkpoint written by save() for the same word lists (if any)."""
+        if not os.path.exists(path):
+            return
+        with open(path) as fh:
+            data = json.load(fh)
+        if data.get("dictVersion") != DICT_VERSION or data.get("breadth") != self.breadth:
+            return
+        self.merge({bytes.fromhex(fp): tuple(v) for fp, v in data["memo"].items()},
+                   {bytes.fromhex(fp): lb for fp, lb in data["bounds"].items()})
+
+    def save(self, path: str) -> None:
+        """Write the memo atomically (temp file + rename)."""
+        data = {
+            "format": FORMAT_VERSION,
+            "dictVersion": DICT_VERSION,
+            "breadth": self.breadth,
+            "memo": {fp.hex(): list(v) for fp, v in self.memo.items()},
+            "bounds": {fp.hex(): lb for fp, lb in self.bounds.items()},
+        }
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as fh:
+            json.dump(data, fh)
+        os.replace(tmp, path)
+
+    def merge(self, memo: Dict[bytes, Tuple[int, int]], bounds: Dict[bytes, int]) -> None:
+        self.memo.update(memo)
+        for b, lb in bounds.items():
+            self.bounds[b] = max(self.bounds.get(b, 0), lb)
+
+
+# ---- building (fans the opener's buckets out across processes) --------------
+
+_WORKER: Optional[TreeSolver] = None
+
+
+def _init_worker(breadth: int, checkpoint: Optional[str]) -> None:
+    global _WORKER
+    _WORKER = TreeSolver(breadth)
+    if checkpoint:
+        _WORKER.load(checkpoint)
+
+
+def _solve_subtree(bits: int):
+    """Solve one bucket exactly; ship back only what this call learned."""
+    before = set(_WORKER.memo), set(_WORKER.bounds)
+    _WORKER.solve(bits)
+    memo = {b: v for b, v in _WORKER.memo.items() if b not in before[0]}
+    bounds = {b: v for b, v in _WORKER.bounds.items() if b not in before[1]}
+    return bits, memo, bounds
+
+
+def build_tree(opener: str,
+               breadth: int = DEFAULT_BREADTH,
+               workers: Optional[int] = None,
+               checkpoint: Optional[str] = None,
+               progress=None) -> dict:
+    """
+    Best tree over every answer after 'opener' among the 'breadth' best
+    guesses per node (the optimal tree only with breadth=0, which "exact"
+    records in the result). Each of the opener's buckets is solved in a
+    worker process; the merged memo is saved to 'checkpoint' after each one,
+    so rerunning with the same checkpoint skips finished work.
+    """
+    g = WORD_ID.get(opener)
+    if g is None:
+        raise ValueError(f"opener {opener!r} is not a valid guess")
+    solver = TreeSolver(breadth)
+    if checkpoint:
+        solver.load(checkpoint)
+
+    root = CandidateSet.full().bits
+    kids = [k for k, _ in solver.children(ANSWER_IDS, g)]
+    todo = [k for k in kids if k.bit_count() > 2 and _fp(k) not in solver.memo]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(breadth, checkpoint)
+        results: Iterable = map(_solve_subtree, todo)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(breadth, checkpoint))
+        results = (f.result() for f in as_completed([pool.submit(_solve_subtree, k) for k in todo]))
+    try:
+        for done, (bits, memo, bounds) in enumerate(results, 1):
+            solver.merge(memo, bounds)
+            if checkpoint:
+                solver.save(checkpoint)
+            if progress:
+                progress(done, len(todo))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    total = N_ANSWERS + sum(solver.solve(k) for k in kids)
+    return {
+        "format": FORMAT_VERSION,
+        "dictVersion": DICT_VERSION,
+        "opener": opener,
+        "breadth": breadth,
+        "exact": breadth == 0,
+        "answers": N_ANSWERS,
+        "totalGuesses": int(total),
+        "average": total / N_ANSWERS,
+        "tree": solver.tree(root, guess=g),
+    }
+
+
+# ---- following a tree ---------------------------------------------------------
+
+def save_tree(tree: dict, path: str = TREE_PATH) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as fh:
+        json.dump(tree, fh, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+@lru_cache(maxsize=None)
+def get_tree() -> Optional[dict]:
+    """The tree at TREE_PATH, loaded once per process (None if missing or stale)."""
+    return load_tree(TREE_PATH)
+
+
+def load_tree(path: str = TREE_PATH) -> Optional[dict]:
+    """The tree at 'path', or None if it is missing or built for other word lists."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as fh:
+        tree = json.load(fh)
+    if tree.get("format") != FORMAT_VERSION or tree.get("dictVersion") != DICT_VERSION:
+        return None
+    return tree
+
+
+def next_guess(tree: dict, history) -> Optional[str]:
+    """
+    The tree's guess after [(guess, pattern), ...] (pattern as a string or
+    code), or None once the history leaves the tree.
+    """
+    node = tree["tree"]
+    for guess, pattern in history:
+        if isinstance(pattern, str):
+            pattern = encode_pattern(pattern)
+        if guess != node["guess"]:
+            return None
+        node = node.get("next", {}).get(decode_pattern(pattern))
+        if node is None:
+            return None
+    return node["guess"]
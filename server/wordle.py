@@ -6,6 +6,7 @@ init(autoreset=True) #Ends color formatting after each print statement
 
 from wordle_secret_words import get_secret_words
 from valid_wordle_guesses import get_valid_wordle_guesses
+from feedback import get_engine
 
 
 valid_wordle_guesses = get_valid_wordle_guesses()
@@ -25,20 +26,25 @@ def get_feedback(guess: str, secret_word: str) -> str:
     if(not basic_check(guess, secret_word)):
         return "-----"
 
-    copy_secret = list(secret_word)
+    # shared feedback engine (see feedback.py), rendered as upper = green,
+    # lower = yellow, '-' = gray
+    code = get_engine().pattern(guess, secret_word)
+    digits = [(code // 3 ** i) % 3 for i in range(5)]
     return_string = ["-", "-", "-", "-", "-"]
 
-    
-    for i in range(len(guess)):
-        if (guess[i] == secret_word[i]):
-            return_string[i] = guess[i].upper()
-            copy_secret[i] = None
+    # unmatched secret letters left after greens, consumed by yellows left to right
+    remaining = {}
+    for i in range(len(secret_word)):
+        if digits[i] != 2:
+            remaining[secret_word[i]] = remaining.get(secret_word[i], 0) + 1
 
     for k in range(len(guess)):
-        if(guess[k] in copy_secret) and (guess[k] != secret_word[k]):
+        if digits[k] == 2:
+            return_string[k] = guess[k].upper()
+        elif digits[k] == 1:
             return_string[k] = guess[k]
-            copy_secret[copy_secret.index(guess[k])] = None
-        if(guess[k] not in copy_secret and guess[k] in alphabet):
+            remaining[guess[k]] -= 1
+        if remaining.get(guess[k], 0) == 0 and guess[k] in alphabet:
             alphabet.remove(guess[k])
     
     return ''.join(return_string)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 from collections import Counter
-from functools import lru_cache
 import argparse
 import random
 from typing import Iterable, List, Set, Tuple
 
+from feedback import get_feedback_cache
+from patterns import decode_pattern
+
 try:
     from colorama import Fore, Back, Style, init as colorama_init
     colorama_init(autoreset=True)
@@ -28,7 +30,6 @@ def load_word_sets() -> Tuple[Set[str], Set[str]]:
 
 # ---- Feedback --------------------------------------------------------------
 
-@lru_cache(maxsize=1_000_000)
 def feedback_pattern(guess: str, answer: str) -> str:
     """
     Compute Wordle feedback between guess and answer, returning a 5-char string in {G,Y,B}.
@@ -41,24 +42,8 @@ def feedback_pattern(guess: str, answer: str) -> str:
     a = answer.lower()
     if len(g) != 5 or len(a) != 5:
         raise ValueError("Guess and answer must be length 5")
-
-    res = ['B'] * 5
-    rem = list(a)
-
-    # Greens
-    for i, ch in enumerate(g):
-        if ch == a[i]:
-            res[i] = 'G'
-            rem[i] = None
-
-    # Yellows
-    for i, ch in enumerate(g):
-        if res[i] == 'B' and ch in rem:
-            res[i] = 'Y'
-            # consume the first available instance
-            rem[rem.index(ch)] = None
-
-    return ''.join(res)
+    # shared feedback engine + pair cache (see feedback.py); this script keeps the string form
+    return decode_pattern(get_feedback_cache().pattern(g, a))
 
 # ---- Candidate maintenance --------------------------------------------------
 
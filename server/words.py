@@ -0,0 +1,62 @@
+"""
+Word table: every valid guess and answer interned to a dense integer id.
+
+Answers take ids 0..N_ANSWERS-1 (so an answer id is also its column in the
+pattern matrix) and the remaining valid guesses follow. Ids fit in uint16,
+so candidate sets and guess pools are plain integer arrays; strings are only
+needed at the API edges.
+"""
+from __future__ import annotations
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from wordle_secret_words import get_secret_words
+from valid_wordle_guesses import get_valid_wordle_guesses
+from patterns import encode_words, wordlist_digest
+
+# Normalize lists to lowercase 5-letter words
+VALID = {w.strip().lower() for w in get_valid_wordle_guesses() if len(w) == 5 and w.isalpha()}
+ANSWERS = {w.strip().lower() for w in get_secret_words()         if len(w) == 5 and w.isalpha()}
+
+WORDS: List[str] = sorted(ANSWERS) + sorted(VALID - ANSWERS)
+WORD_ID = {w: i for i, w in enumerate(WORDS)}
+N_ANSWERS = len(ANSWERS)
+N_WORDS = len(WORDS)
+
+# Identifies this exact dictionary (and id assignment) in derived artifacts
+DICT_VERSION = wordlist_digest(WORDS, WORDS[:N_ANSWERS]).hex()[:16]
+
+# LETTERS[i] is WORDS[i] as 5 letter indexes, for the vectorized kernel
+LETTERS = encode_words(WORDS)
+
+ID_DTYPE = np.uint16
+ANSWER_IDS = np.arange(N_ANSWERS, dtype=ID_DTYPE)
+GUESS_IDS = np.arange(N_WORDS, dtype=ID_DTYPE)
+ANSWER_IDS.flags.writeable = False
+GUESS_IDS.flags.writeable = False
+
+
+def to_ids(words: Iterable[str]) -> Optional[np.ndarray]:
+    """Sorted uint16 ids for 'words', or None if any word is not in the table."""
+    try:
+        ids = np.fromiter((WORD_ID[w] for w in words), dtype=ID_DTYPE)
+    except KeyError:
+        return None
+    ids.sort()
+    return ids
+
+
+def id_flags(ids: np.ndarray) -> np.ndarray:
+    """Length-N_WORDS bool array, True at 'ids' (e.g. is_cand for scoring)."""
+    flags = np.zeros(N_WORDS, dtype=bool)
+    flags[ids] = True
+    return flags
+
+
+def to_words(ids: Iterable[int]) -> List[str]:
+    return [WORDS[i] for i in ids]
+
+
+def is_answer_id(i: int) -> bool:
+    return 0 <= i < N_ANSWERS